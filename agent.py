@@ -1,19 +1,79 @@
-import os
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langgraph.prebuilt import create_react_agent
-from tools import tools
-
-load_dotenv()
-
-google_api_key = os.getenv("GOOGLE_API_KEY")
-if not google_api_key:
-    raise ValueError("GOOGLE_API_KEY environment variable not set")
-
-model = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0,
-    google_api_key=google_api_key
-
-agent_executor = create_react_agent(model, tools)
-)
\ No newline at end of file
+import os
+import threading
+from dotenv import load_dotenv
+from tools import tools
+
+load_dotenv()
+
+_lock = threading.RLock()
+_model = None
+_checkpointer = None
+_agent = None
+
+def get_model():
+    """Shared Gemini chat model, created on first use"""
+    global _model
+    with _lock:
+        if _model is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            google_api_key = os.getenv("GOOGLE_API_KEY")
+            if not google_api_key:
+                raise ValueError("GOOGLE_API_KEY environment variable not set")
+            _model = ChatGoogleGenerativeAI(
+                model="gemini-2.5-flash",
+                temperature=0,
+                google_api_key=google_api_key
+            )
+        return _model
+
+def get_checkpointer():
+    """Shared thread checkpointer, created on first use"""
+    global _checkpointer
+    with _lock:
+        if _checkpointer is None:
+            from checkpointing import make_checkpointer
+            _checkpointer = make_checkpointer()
+        return _checkpointer
+
+def close_checkpointer():
+    """Close the SQLite connection behind the shared checkpointer, if one was opened"""
+    global _checkpointer
+    with _lock:
+        checkpointer, _checkpointer = _checkpointer, None
+    connection = getattr(checkpointer, "conn", None)
+    if connection is not None:
+        connection.close()
+
+def build_agent(model=None, checkpointer=None, agent_tools=None):
+    """ReAct agent over the shared tools (or agent_tools) with history compaction"""
+    from langgraph.prebuilt import create_react_agent
+    from history import ConversationWindow
+    if model is None:
+        model = get_model()
+    if checkpointer is None:
+        checkpointer = get_checkpointer()
+    history_window = ConversationWindow(model)
+    return create_react_agent(
+        model,
+        agent_tools if agent_tools is not None else tools,
+        checkpointer=checkpointer,
+        pre_model_hook=history_window.pre_model_hook,
+    )
+
+def get_agent():
+    """Shared agent over the Gemini model, built on first use"""
+    global _agent
+    with _lock:
+        if _agent is None:
+            _agent = build_agent()
+        return _agent
+
+def __getattr__(name):
+    # Keep `from agent import agent_executor, model` working without building them at import
+    if name == "agent_executor":
+        return get_agent()
+    if name == "model":
+        return get_model()
+    if name == "checkpointer":
+        return get_checkpointer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
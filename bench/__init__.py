@@ -0,0 +1,7 @@
+"""Offline end-to-end benchmark for the shopping agent.
+
+Run with ``python -m bench.run``. Everything is served from a local
+HTTP server (stand-in retailer pages plus fake Tavily and Serper APIs)
+and the LLM is a scripted fake, so no network access or API keys are
+needed.
+"""
@@ -0,0 +1,132 @@
+import re
+from urllib.parse import urlencode, urljoin
+from lxml import html as lxml_html
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from http_client import get_client
+
+_ATTRIBUTE = re.compile(r"^(?P<tag>[\w-]*)\[(?P<attr>[\w-]+)(?:(?P<op>[*^$]?=)['\"]?(?P<value>[^'\"\]]*)['\"]?)?\]$")
+
+
+def _matches(element, selector):
+    # Enough CSS for the selectors execute_action uses: tag, #id, .class, tag[attr(op)value]
+    selector = selector.strip()
+    if selector.startswith("#"):
+        return element.get("id") == selector[1:]
+    if selector.startswith("."):
+        return selector[1:] in (element.get("class") or "").split()
+    match = _ATTRIBUTE.match(selector)
+    if match:
+        if match.group("tag") and element.tag != match.group("tag"):
+            return False
+        actual = element.get(match.group("attr"))
+        if actual is None:
+            return False
+        op, value = match.group("op"), match.group("value")
+        if op is None:
+            return True
+        if op == "=":
+            return actual == value
+        if op == "*=":
+            return value in actual
+        if op == "^=":
+            return actual.startswith(value)
+        return actual.endswith(value)
+    return element.tag == selector
+
+
+class FakeElement:
+    def __init__(self, driver, element):
+        self.driver = driver
+        self.element = element
+        self.value = element.get("value") or ""
+
+    @property
+    def text(self):
+        return self.element.text_content().strip()
+
+    def get_attribute(self, name):
+        return self.element.get(name)
+
+    def clear(self):
+        self.value = ""
+
+    def send_keys(self, *keys):
+        for key in keys:
+            if key == Keys.RETURN or key == Keys.ENTER:
+                self.submit()
+            else:
+                self.value += key
+
+    def submit(self):
+        form = next((ancestor for ancestor in self.element.iterancestors() if ancestor.tag == "form"), None)
+        if form is None:
+            return
+        action = urljoin(self.driver.current_url, form.get("action") or self.driver.current_url)
+        name = self.element.get("name") or "q"
+        self.driver.get(f"{action}?{urlencode({name: self.value})}")
+
+    def click(self):
+        href = self.element.get("href")
+        if href:
+            self.driver.get(urljoin(self.driver.current_url, href))
+        elif self.element.tag in ("button", "input"):
+            self.submit()
+
+
+class FakeDriver:
+    """HTTP-backed stand-in for uc.Chrome, used when the benchmark runs without a browser"""
+
+    def __init__(self):
+        self.current_url = "about:blank"
+        self.page_source = "<html><head><title></title></head><body></body></html>"
+        self.tree = lxml_html.fromstring(self.page_source)
+        self.cookies = []
+
+    @property
+    def title(self):
+        title = self.tree.find(".//title")
+        return title.text_content().strip() if title is not None else ""
+
+    def get(self, url):
+        response = get_client().get(url)
+        self.current_url = str(response.url)
+        self.page_source = response.text
+        self.tree = lxml_html.fromstring(response.content)
+
+    def find_elements(self, by, value):
+        if by == By.ID:
+            selectors = [f"#{value}"]
+        elif by == By.NAME:
+            selectors = [f"[name='{value}']"]
+        elif by == By.TAG_NAME:
+            selectors = [value]
+        else:
+            selectors = value.split(",")
+        return [
+            FakeElement(self, element)
+            for element in self.tree.iter()
+            if isinstance(element.tag, str) and any(_matches(element, selector) for selector in selectors)
+        ]
+
+    def find_element(self, by, value):
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(f"no element matching {value!r}")
+        return found[0]
+
+    def execute_script(self, script, *args):
+        return None
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def delete_all_cookies(self):
+        self.cookies = []
+
+    def quit(self):
+        pass
@@ -0,0 +1,61 @@
+import json
+import re
+import time
+from typing import Any, Iterator, List, Optional
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from history import SUMMARY_PROMPT
+
+
+class ScriptedChatModel(GenericFakeChatModel):
+    """Stands in for ChatGoogleGenerativeAI, replaying a fixed list of responses.
+
+    Each model call returns the next scripted AIMessage, so a scenario
+    scripts the tool calls the real model would make. ``latency`` adds a
+    fixed think time per call. History summarization requests are
+    answered with a canned summary and don't consume the script.
+    """
+
+    latency: float = 0.0
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if messages and messages[0].content == SUMMARY_PROMPT:
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content="Earlier turns searched for products."))])
+        if self.latency:
+            time.sleep(self.latency)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        # Word-by-word like a real streaming model; tool calls arrive whole in the last chunk
+        message = self._generate(messages, stop=stop, run_manager=run_manager, **kwargs).generations[0].message
+        for token in re.split(r"(?<=\s)", message.content):
+            if token:
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=token, id=message.id))
+                if run_manager:
+                    run_manager.on_llm_new_token(token, chunk=chunk)
+                yield chunk
+        if message.tool_calls or not message.content:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                id=message.id,
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                    for index, call in enumerate(message.tool_calls)
+                ],
+            ))
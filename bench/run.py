@@ -0,0 +1,205 @@
+"""Run the offline benchmark: python -m bench.run [--driver fake|chrome] [--repeat N] [--json out.json]"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+from langchain_core.callbacks import BaseCallbackHandler
+from bench.shop_site import ShopSite
+
+
+class Recorder(BaseCallbackHandler):
+    """Collects latency samples for turns, tools and driver actions"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.started = {}
+        self.lock = threading.Lock()
+
+    def record(self, key, seconds):
+        with self.lock:
+            self.samples[key].append(seconds * 1000)
+
+    def timed(self, key, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(key(*args, **kwargs) if callable(key) else key, time.perf_counter() - start)
+        return wrapper
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = (serialized or {}).get("name") or kwargs.get("name", "unknown")
+        with self.lock:
+            self.started[run_id] = (name, time.perf_counter())
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        with self.lock:
+            name, start = self.started.pop(run_id, (None, None))
+        if name is not None:
+            self.record(f"tool:{name}", time.perf_counter() - start)
+
+    on_tool_error = on_tool_end
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "count": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(p95, 2),
+        "mean_ms": round(statistics.fmean(ordered), 2),
+    }
+
+
+def configure_environment(site, driver, browser_workers=0):
+    # Must run before any repo module is imported: endpoints and keys are read at import time
+    os.environ.setdefault("GOOGLE_API_KEY", "bench-offline")
+    os.environ.setdefault("TAVILY_API_KEY", "bench-offline")
+    os.environ.setdefault("SERPER_API_KEY", "bench-offline")
+    os.environ.setdefault("OPENAI_API_KEY", "bench-offline")
+    os.environ.setdefault("ENCRYPTION_KEY", "YmVuY2gtb2ZmbGluZS1rZXktMzItYnl0ZXMtbG9uZyE=")
+    os.environ["TAVILY_API_URL"] = f"{site.base_url}/tavily"
+    os.environ["SERPER_URL"] = f"{site.base_url}/serper/search"
+    # Learn selectors and cache pages in memory only, so runs don't depend on a previous run's cache files
+    os.environ.setdefault("SELECTOR_CACHE_PATH", "")
+    os.environ.setdefault("PAGE_CACHE_PATH", "")
+    # Every fake retailer is served from 127.0.0.1, so per-domain limits would throttle them as one site
+    os.environ.setdefault("DOMAIN_RATE_LIMIT", "0")
+    os.environ.setdefault("HOST_CONCURRENCY", "0")
+    if driver == "fake":
+        os.environ["DRIVER_POOL_SIZE"] = "0"
+        # Worker processes can't see the monkeypatched pool, so name the fake driver for them
+        os.environ["DRIVER_FACTORY"] = "bench.fake_driver:FakeDriver"
+    os.environ["BROWSER_WORKERS"] = str(browser_workers)
+
+
+def run(args):
+    site = ShopSite(latency=args.site_latency_ms / 1000).start()
+    configure_environment(site, args.driver, args.browser_workers)
+
+    from langgraph.checkpoint.memory import MemorySaver
+    import agent
+    import tools
+    from search_cache import search_cache
+    from session_manager import session_manager
+    from bench.fake_llm import ScriptedChatModel
+    from bench.scenarios import SCENARIOS
+    from streaming import stream_turn
+
+    import retailers
+    for retailer in tools.WEBSITE_URLS:
+        tools.WEBSITE_URLS[retailer] = f"{site.base_url}/{retailer}/"
+    for retailer in retailers.SEARCH_URLS:
+        retailers.SEARCH_URLS[retailer] = f"{site.base_url}/{retailer}/search?q={{query}}"
+
+    recorder = Recorder()
+    if args.driver == "fake":
+        from bench.fake_driver import FakeDriver
+        session_manager.pool.create_driver = FakeDriver
+    session_manager.pool.create_driver = recorder.timed("driver:create", session_manager.pool.create_driver)
+    session_manager.execute_action = recorder.timed(
+        lambda session_id, action, *rest, **kwargs: f"action:{action}",
+        session_manager.execute_action,
+    )
+
+    if args.trace_memory:
+        tracemalloc.start()
+    memory = {}
+    names = args.scenario or list(SCENARIOS)
+    for name in names:
+        scenario = SCENARIOS[name]
+        if args.trace_memory:
+            tracemalloc.reset_peak()
+        for _ in range(args.repeat):
+            search_cache.clear()
+            session_id = f"bench-{uuid.uuid4().hex[:8]}"
+            turns = scenario.turns(site.base_url, session_id)
+            model = ScriptedChatModel(
+                messages=iter([response for _, responses in turns for response in responses]),
+                latency=args.llm_latency_ms / 1000,
+            )
+            executor = agent.build_agent(model, checkpointer=MemorySaver())
+            config = {"configurable": {"thread_id": session_id}, "callbacks": [recorder]}
+            for user_text, _ in turns:
+                start = time.perf_counter()
+                first_token = None
+                for kind, _ in stream_turn(executor, user_text, config):
+                    if kind == "token" and first_token is None:
+                        first_token = time.perf_counter() - start
+                recorder.record(f"turn:{name}", time.perf_counter() - start)
+                if first_token is not None:
+                    recorder.record(f"first_token:{name}", first_token)
+            session_manager.close_session(session_id)
+        if args.trace_memory:
+            memory[f"{name}_peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+
+    memory["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+    session_manager.shutdown()
+    site.stop()
+    return {
+        "driver": args.driver,
+        "repeat": args.repeat,
+        "metrics": {key: summarize(values) for key, values in sorted(recorder.samples.items())},
+        "memory": memory,
+    }
+
+
+def print_report(report):
+    print(f"driver={report['driver']} repeat={report['repeat']}")
+    print(f"{'metric':40} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'mean ms':>10}")
+    for key, stats in report["metrics"].items():
+        print(f"{key:40} {stats['count']:>6} {stats['p50_ms']:>10} {stats['p95_ms']:>10} {stats['mean_ms']:>10}")
+    for key, value in report["memory"].items():
+        print(f"{key:40} {value:>10}")
+
+
+def compare(report, baseline, tolerance):
+    """Metrics whose p50 regressed by more than tolerance (and at least 1 ms)"""
+    regressions = []
+    for key, stats in report["metrics"].items():
+        before = baseline.get("metrics", {}).get(key)
+        if before and stats["p50_ms"] > before["p50_ms"] * (1 + tolerance) and stats["p50_ms"] - before["p50_ms"] >= 1:
+            regressions.append(f"{key}: p50 {before['p50_ms']} ms -> {stats['p50_ms']} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline shopping-agent benchmark")
+    parser.add_argument("--driver", choices=["fake", "chrome"], default="fake", help="fake: HTTP-backed stand-in driver; chrome: real pooled Chrome")
+    parser.add_argument("--scenario", action="append", help="scenario to run (repeatable, default all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--site-latency-ms", type=float, default=0, help="added latency per shop/API response")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="added think time per fake model call")
+    parser.add_argument("--trace-memory", action="store_true", help="report tracemalloc peaks per scenario (slows the run)")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="fail if p50 latencies regress against this earlier --json report")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--browser-workers", type=int, default=0, help="run drivers in this many worker processes")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
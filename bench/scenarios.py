@@ -0,0 +1,114 @@
+import itertools
+from langchain_core.messages import AIMessage
+
+_call_ids = itertools.count()
+
+
+def call(*calls):
+    """Scripted model turn issuing one or more (tool name, args) calls"""
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": name, "args": args, "id": f"call_{next(_call_ids)}"} for name, args in calls],
+    )
+
+
+def say(text):
+    return AIMessage(content=text)
+
+
+class Scenario:
+    """A named conversation: each turn is a user message plus the model responses it triggers"""
+
+    def __init__(self, name, build):
+        self.name = name
+        self.build = build
+
+    def turns(self, base_url, session_id):
+        return self.build(base_url, session_id)
+
+
+def _search(base_url, session_id):
+    return [
+        ("Find me a laptop on Amazon", [
+            call(("search_product", {"product_name": "laptop", "website": "Amazon"})),
+            call(("tavily_search", {"query": "best laptop deals"})),
+            say("The UltraBook 14 Laptop is $899 and the Gaming Laptop 16 is $1299.99."),
+        ]),
+        ("What does the wider web say?", [
+            call(("web_search", {"query": "laptop deals"})),
+            say("Best Buy lists both laptops with free shipping."),
+        ]),
+        ("Search Amazon for laptops again", [
+            call(("search_product", {"product_name": "laptop", "website": "Amazon"})),
+            say("Same results as before."),
+        ]),
+    ]
+
+
+def _scrape(base_url, session_id):
+    product = f"{base_url}/amazon/dp/0"
+    return [
+        ("Tell me about this product: " + product, [
+            call(("get_product_details", {"url": product})),
+            call(("scrape", {"url": product})),
+            say("It is the UltraBook 14 Laptop for $899, rated 4.4 from 321 reviews."),
+        ]),
+        ("And the listing page?", [
+            call(("scrape", {"url": f"{base_url}/amazon/search?q=laptop"})),
+            call(("get_product_details", {"url": f"{base_url}/amazon/dp/1", "fast": False})),
+            say("There are two laptops listed."),
+        ]),
+    ]
+
+
+def _purchase(base_url, session_id):
+    profile = {
+        "name": "Bench User",
+        "email": "bench@example.com",
+        "phone": "555-0100",
+        "address": "1 Bench St, Testville",
+        "credit_card": "4111111111111111",
+        "password": "bench-password",
+    }
+    return [
+        ("Store my details", [
+            call(*[("store_personal_info", {"session_id": session_id, "info_type": key, "value": value}) for key, value in profile.items()]),
+            say("Stored your details securely."),
+        ]),
+        ("Buy a TV on BestBuy", [
+            call(("purchase_product", {"session_id": session_id, "product_name": "tv", "website": "BestBuy"})),
+            say("I found the TV and simulated the purchase."),
+        ]),
+        ("Add the 55 inch TV to my cart and start checkout", [
+            call(("navigate", {"session_id": session_id, "url": f"{base_url}/bestbuy/dp/2"})),
+            call(("click_element", {"session_id": session_id, "element_id": "add-to-cart-button"})),
+            call(("navigate", {"session_id": session_id, "url": f"{base_url}/bestbuy/checkout"})),
+            call(("get_personal_info", {"session_id": session_id, "info_type": "email"})),
+            call(("fill_form", {"session_id": session_id, "field_id": "email", "value": profile["email"]})),
+            say("The TV is in your cart and checkout has started."),
+        ]),
+    ]
+
+
+def _compare(base_url, session_id):
+    return [
+        ("Where is a laptop cheapest?", [
+            call(("compare_prices", {"product_name": "laptop"})),
+            say("The UltraBook 14 Laptop at $899 is the cheapest across all eight retailers."),
+        ]),
+        ("Only Amazon and eBay for headphones", [
+            call(("compare_prices", {"product_name": "headphones", "retailers": ["Amazon", "eBay"], "max_results": 3})),
+            say("Noise Cancelling Headphones are $249 on both."),
+        ]),
+    ]
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("search", _search),
+        Scenario("scrape", _scrape),
+        Scenario("purchase", _purchase),
+        Scenario("compare", _compare),
+    ]
+}
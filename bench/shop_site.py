@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+RETAILERS = ["amazon", "bestbuy", "walmart", "ebay", "target", "costco", "newegg", "daraz"]
+
+PRODUCTS = [
+    ("laptop", "UltraBook 14 Laptop", "899.00"),
+    ("laptop", "Gaming Laptop 16", "1299.99"),
+    ("tv", "55 inch 4K Smart TV", "449.99"),
+    ("tv", "65 inch OLED TV", "1599.00"),
+    ("phone", "Pixel-style Smartphone 128GB", "599.00"),
+    ("phone", "Budget Phone 64GB", "149.99"),
+    ("headphones", "Noise Cancelling Headphones", "249.00"),
+    ("headphones", "Wireless Earbuds", "79.99"),
+]
+
+# Retail product pages are mostly inline script; this keeps the stand-in pages realistically heavy
+SCRIPT_PADDING = "<script>window.__STATE__ = " + json.dumps({"blob": "x" * 200_000}) + ";</script>"
+TEXT_PADDING = "".join(f"<p>Customer review {i}: works as described, fast shipping.</p>" for i in range(2000))
+
+
+def _page(retailer, title, head="", body=""):
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{title}</title>{head}{SCRIPT_PADDING}</head>"
+        f"<body><header><form action='/{retailer}/search' method='get'><input type='search' name='q'></form></header>{body}</body></html>"
+    )
+
+
+def _matches(query):
+    words = query.lower().split()
+    found = [(index, product) for index, product in enumerate(PRODUCTS) if any(word in product[0] or word in product[1].lower() for word in words)]
+    return found or list(enumerate(PRODUCTS))[:2]
+
+
+class ShopHandler(BaseHTTPRequestHandler):
+    """Serves /<retailer>/... shop pages plus fake /tavily/search and /serper/search APIs"""
+
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8"):
+        if self.latency:
+            time.sleep(self.latency)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _base(self):
+        return f"http://{self.headers.get('Host')}"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        if not parts or parts[0] not in RETAILERS:
+            return self._send(404, "<html><head><title>Not found</title></head></html>")
+        retailer = parts[0]
+        name = retailer.title()
+        page = parts[1] if len(parts) > 1 else ""
+        if page == "":
+            return self._send(200, _page(retailer, f"{name} - Online Shopping", body=f"<h1>Welcome to {name}</h1>{TEXT_PADDING}"))
+        if page in ("search", "s"):
+            query = (parse_qs(url.query).get("q") or parse_qs(url.query).get("k") or [""])[0]
+            items = "".join(
+                f"<div class='result'><a class='product-link' href='/{retailer}/dp/{index}'>{title}</a> <span class='price'>${price}</span></div>"
+                for index, (_, title, price) in _matches(query)
+            )
+            return self._send(200, _page(retailer, f"{name}: {query}", body=f"<h1>Results for {query}</h1>{items}"))
+        if page == "dp" and len(parts) > 2 and parts[2].isdigit() and int(parts[2]) < len(PRODUCTS):
+            _, title, price = PRODUCTS[int(parts[2])]
+            ld = json.dumps({
+                "@context": "https://schema.org",
+                "@type": "Product",
+                "name": title,
+                "brand": {"@type": "Brand", "name": "BenchBrand"},
+                "offers": {"@type": "Offer", "price": price, "priceCurrency": "USD", "availability": "https://schema.org/InStock"},
+                "aggregateRating": {"@type": "AggregateRating", "ratingValue": "4.4", "reviewCount": "321"},
+            })
+            head = f"<meta property='og:title' content='{title}'><script type='application/ld+json'>{ld}</script>"
+            body = (
+                f"<h1>{title}</h1><span class='price'>${price}</span>"
+                f"<a id='add-to-cart-button' href='/{retailer}/cart'>Add to Cart</a>{TEXT_PADDING}"
+            )
+            return self._send(200, _page(retailer, f"{title} | {name}", head=head, body=body))
+        if page == "cart":
+            body = f"<h1>Your cart</h1><a class='checkout-button' href='/{retailer}/checkout'>Proceed to checkout</a>"
+            return self._send(200, _page(retailer, f"{name} Cart", body=body))
+        if page == "checkout":
+            body = (
+                "<form><input name='email' id='email'><input name='password' type='password' id='password'>"
+                "<input name='address' id='address'><input name='card-number' id='card-number'>"
+                "<button id='signInSubmit' name='login'>Sign in</button></form>"
+            )
+            return self._send(200, _page(retailer, f"{name} Checkout", body=body))
+        return self._send(404, _page(retailer, "Not found"))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        base = self._base()
+        if self.path.rstrip("/").endswith("/tavily/search"):
+            query = payload.get("query", "")
+            results = [
+                {
+                    "title": f"{title} - Amazon",
+                    "url": f"{base}/amazon/dp/{index}",
+                    "content": f"{title} for ${price}. Free shipping on orders over $35. Rated 4.4 out of 5.",
+                    "score": 0.9,
+                }
+                for index, (_, title, price) in _matches(query)
+            ][:payload.get("max_results", 5)]
+            return self._send(200, json.dumps({"query": query, "results": results, "response_time": 0.01}), "application/json")
+        if self.path.rstrip("/").endswith("/serper/search"):
+            query = payload.get("q", "")
+            organic = [
+                {"title": title, "link": f"{base}/bestbuy/dp/{index}", "snippet": f"Buy {title} for ${price}.", "position": position + 1}
+                for position, (index, (_, title, price)) in enumerate(_matches(query))
+            ]
+            return self._send(200, json.dumps({"searchParameters": {"q": query}, "organic": organic}), "application/json")
+        return self._send(404, "{}", "application/json")
+
+
+class ShopSite:
+    """Local shop server running on a background thread"""
+
+    def __init__(self, latency=0.0, port=0):
+        handler = type("BenchShopHandler", (ShopHandler,), {"latency": latency})
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="bench-shop", daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def search_url(self, retailer, query):
+        return f"{self.base_url}/{retailer}/search?q={quote_plus(query)}"
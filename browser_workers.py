@@ -0,0 +1,225 @@
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Session manager methods a worker will run on the router's behalf
+WORKER_METHODS = {"execute_action", "close_session", "release_driver"}
+
+
+def _worker_main(conn, worker_id):
+    """Browser worker process: owns its own drivers and runs session calls sent over conn"""
+    from session_manager import session_manager
+    session_manager.run_in_process()
+    send_lock = threading.Lock()
+    executor = ThreadPoolExecutor(
+        max_workers=int(os.getenv("BROWSER_WORKER_THREADS", "8")),
+        thread_name_prefix=f"browser-worker-{worker_id}",
+    )
+
+    def handle(request_id, method, args, kwargs):
+        try:
+            if method not in WORKER_METHODS:
+                raise ValueError(f"Unsupported worker method: {method}")
+            reply = (request_id, True, getattr(session_manager, method)(*args, **kwargs))
+        except Exception as e:
+            reply = (request_id, False, f"{type(e).__name__}: {str(e)}")
+        with send_lock:
+            conn.send(reply)
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        executor.submit(handle, *message)
+    executor.shutdown(wait=True)
+    session_manager.shutdown()
+
+
+class WorkerDied(RuntimeError):
+    pass
+
+
+class BrowserWorker:
+    """Parent-side handle to one worker process; calls return futures matched to replies by id"""
+
+    def __init__(self, worker_id, on_exit):
+        self.worker_id = worker_id
+        self.on_exit = on_exit
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, worker_id),
+            name=f"browser-worker-{worker_id}",
+            daemon=True,
+        )
+        self.process.start()
+        self.started = time.monotonic()
+        child_conn.close()
+        self.ids = itertools.count()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.alive = True
+        self.stopping = False
+        self.reader = threading.Thread(target=self._read, name=f"browser-worker-{worker_id}-reader", daemon=True)
+        self.reader.start()
+
+    def call(self, method, *args, **kwargs):
+        future = Future()
+        with self.lock:
+            if not self.alive:
+                raise WorkerDied(f"Browser worker {self.worker_id} is not running")
+            request_id = next(self.ids)
+            self.pending[request_id] = future
+            try:
+                self.conn.send((request_id, method, args, kwargs))
+            except (OSError, ValueError) as e:
+                self.pending.pop(request_id, None)
+                raise WorkerDied(f"Browser worker {self.worker_id} is not reachable: {str(e)}")
+        return future
+
+    def _read(self):
+        while True:
+            try:
+                request_id, ok, value = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            with self.lock:
+                future = self.pending.pop(request_id, None)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(RuntimeError(value))
+        # Pipe closed: the process exited or crashed; fail whatever was still waiting on it
+        with self.lock:
+            self.alive = False
+            pending, self.pending = self.pending, {}
+        for future in pending.values():
+            future.set_exception(WorkerDied(f"Browser worker {self.worker_id} exited"))
+        if not self.stopping:
+            self.on_exit(self)
+
+    def stop(self, timeout=10):
+        self.stopping = True
+        with self.lock:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+
+
+class WorkerRouter:
+    """Pins each session to one browser worker process, re-pinning sessions of a worker that dies"""
+
+    def __init__(self, size, call_timeout=None):
+        self.call_timeout = call_timeout if call_timeout is not None else float(os.getenv("BROWSER_WORKER_TIMEOUT", "120"))
+        self.lock = threading.Lock()
+        self.affinity = {}
+        # Crashing workers are restarted after restart_delay, doubling per crash; past max_restarts they stay down
+        self.max_restarts = int(os.getenv("BROWSER_WORKER_MAX_RESTARTS", "5"))
+        self.restart_delay = float(os.getenv("BROWSER_WORKER_RESTART_DELAY", "1"))
+        # A worker that stayed up this long has its crash count reset
+        self.stable_after = float(os.getenv("BROWSER_WORKER_STABLE_AFTER", "300"))
+        self.restarts = [0] * size
+        # Sessions lost with a worker that was given up on, and why; their next call reports it
+        self.failed = {}
+        self.closed = False
+        self.stopped = threading.Event()
+        self.workers = [BrowserWorker(worker_id, self._on_exit) for worker_id in range(size)]
+
+    def _worker_for(self, session_id):
+        with self.lock:
+            if self.closed:
+                raise WorkerDied("Browser workers have been shut down")
+            if session_id in self.failed:
+                # Reported once; the session's next call starts over on a live worker
+                raise WorkerDied(self.failed.pop(session_id))
+            index = self.affinity.get(session_id)
+            if index is None or not self.workers[index].alive:
+                # New (or orphaned) sessions go to the live worker holding the fewest sessions
+                load = {i: 0 for i, worker in enumerate(self.workers) if worker.alive}
+                if not load:
+                    raise WorkerDied("No browser workers are running")
+                for pinned in self.affinity.values():
+                    if pinned in load:
+                        load[pinned] += 1
+                index = min(load, key=load.get)
+                self.affinity[session_id] = index
+            return self.workers[index]
+
+    def call(self, session_id, method, *args, **kwargs):
+        worker = self._worker_for(session_id)
+        return worker.call(method, session_id, *args, **kwargs).result(self.call_timeout)
+
+    def execute_action(self, session_id, action, *args, **kwargs):
+        try:
+            return self.call(session_id, "execute_action", action, *args, **kwargs)
+        except Exception as e:
+            return f"Error in {action}: {str(e)}"
+
+    def close_session(self, session_id, keep_info=False):
+        with self.lock:
+            self.failed.pop(session_id, None)
+            index = self.affinity.get(session_id) if keep_info else self.affinity.pop(session_id, None)
+        if index is None or not self.workers[index].alive:
+            return
+        method = "release_driver" if keep_info else "close_session"
+        try:
+            self.workers[index].call(method, session_id).result(self.call_timeout)
+        except Exception as e:
+            print(f"Could not close session {session_id} on browser worker {index}: {str(e)}")
+
+    def session_count(self):
+        with self.lock:
+            return len(self.affinity)
+
+    def _on_exit(self, worker):
+        worker_id = worker.worker_id
+        with self.lock:
+            if self.closed:
+                return
+            orphaned = [sid for sid, index in self.affinity.items() if index == worker_id]
+            for session_id in orphaned:
+                del self.affinity[session_id]
+            if time.monotonic() - worker.started >= self.stable_after:
+                self.restarts[worker_id] = 0
+            attempt = self.restarts[worker_id]
+            if attempt >= self.max_restarts:
+                message = f"Browser worker {worker_id} crashed {attempt + 1} times in a row and was not restarted"
+                for session_id in orphaned:
+                    self.failed[session_id] = message
+                print(f"{message}; {len(orphaned)} sessions failed")
+                return
+            self.restarts[worker_id] = attempt + 1
+        delay = self.restart_delay * 2 ** attempt
+        print(f"Browser worker {worker_id} exited; restarting it in {delay:.1f}s and re-pinning {len(orphaned)} sessions")
+        # Runs on the dead worker's reader thread, so waiting here holds up nothing else
+        if self.stopped.wait(delay):
+            return
+        replacement = BrowserWorker(worker_id, self._on_exit)
+        with self.lock:
+            if self.closed:
+                replacement.stop()
+                return
+            self.workers[worker_id] = replacement
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+            workers = list(self.workers)
+        self.stopped.set()
+        for worker in workers:
+            worker.stop()
@@ -0,0 +1,17 @@
+import os
+import sqlite3
+from langgraph.checkpoint.memory import MemorySaver
+
+
+def make_checkpointer(path=None):
+    """SQLite checkpointer when AGENT_CHECKPOINT_DB is set, in-memory otherwise"""
+    if path is None:
+        path = os.getenv("AGENT_CHECKPOINT_DB")
+    if not path:
+        return MemorySaver()
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    # The agent streams from Streamlit and tool threads, so the connection is shared across threads
+    connection = sqlite3.connect(path, check_same_thread=False)
+    checkpointer = SqliteSaver(connection)
+    checkpointer.setup()
+    return checkpointer
@@ -0,0 +1,171 @@
+import importlib
+import os
+import queue
+import threading
+import time
+import metrics
+
+# Blocked in fast-load mode: heavy static resources plus common ad/analytics hosts
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*doubleclick.net*", "*googlesyndication.com*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*googleadservices.com*", "*facebook.net*", "*amazon-adsystem.com*", "*scorecardresearch.com*",
+    "*hotjar.com*", "*criteo.com*", "*taboola.com*", "*outbrain.com*",
+]
+
+
+def build_chrome_options(user_agent, headless=True, page_load_strategy="normal"):
+    """Build the Chrome options shared by every agent browser"""
+    import undetected_chromedriver as uc
+    options = uc.ChromeOptions()
+    # eager returns once the DOM is parsed, none as soon as navigation commits
+    options.page_load_strategy = page_load_strategy
+    if headless:
+        options.add_argument("--headless")
+
+    options.add_argument("--disable-web-security")
+    options.add_argument("--allow-running-insecure-content")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    # No --remote-debugging-port: undetected_chromedriver picks a free one per driver and sets debugger_address
+
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    options.add_argument(f"--user-agent={user_agent}")
+    return options
+
+
+def block_resources(driver, patterns=BLOCKED_URL_PATTERNS):
+    """Have Chrome drop requests matching patterns before they hit the network"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+
+class DriverPool:
+    """Keeps a few configured Chrome drivers warm so sessions don't pay cold start"""
+
+    def __init__(self, size=None, headless=True, fast_load=False, page_load_strategy="normal"):
+        if size is None:
+            size = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+        self.size = size
+        self.headless = headless
+        self.fast_load = fast_load
+        self.page_load_strategy = page_load_strategy
+        self._idle = queue.Queue()
+        self._pending = 0
+        self._closed = False
+        self._ua = None
+        self.lock = threading.Lock()
+        metrics.POOL_IDLE.set_function(self._idle.qsize)
+        metrics.POOL_PENDING.set_function(lambda: self._pending)
+
+    def _user_agent(self):
+        # UserAgent() loads its browser database on construction, so build it once per pool
+        with self.lock:
+            if self._ua is None:
+                from fake_useragent import UserAgent
+                self._ua = UserAgent()
+            return self._ua.random
+
+    def create_driver(self):
+        """Launch a new configured Chrome driver"""
+        # DRIVER_FACTORY="module:callable" swaps Chrome out, e.g. for the benchmark's HTTP-backed driver
+        factory = os.getenv("DRIVER_FACTORY")
+        if factory:
+            module, _, name = factory.partition(":")
+            return getattr(importlib.import_module(module), name)()
+        # Browser libraries load on first launch, not when the app starts
+        import undetected_chromedriver as uc
+        options = build_chrome_options(self._user_agent(), headless=self.headless, page_load_strategy=self.page_load_strategy)
+        driver = uc.Chrome(options=options, use_subprocess=False)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        if self.fast_load:
+            try:
+                block_resources(driver)
+            except Exception as e:
+                print(f"Resource blocking unavailable: {str(e)}")
+        return driver
+
+    def start(self):
+        """Begin warming drivers in the background"""
+        self._refill()
+
+    def _refill(self):
+        with self.lock:
+            if self._closed:
+                return
+            missing = self.size - self._idle.qsize() - self._pending
+            if missing <= 0:
+                return
+            self._pending += missing
+        for _ in range(missing):
+            threading.Thread(target=self._warm_one, daemon=True).start()
+
+    def _launch(self):
+        start = time.perf_counter()
+        driver = self.create_driver()
+        metrics.DRIVER_CREATE_SECONDS.observe(time.perf_counter() - start)
+        return driver
+
+    def _warm_one(self):
+        try:
+            driver = self._launch()
+        except Exception as e:
+            print(f"Driver pool warmup failed: {str(e)}")
+            driver = None
+        with self.lock:
+            self._pending -= 1
+            closed = self._closed
+        if driver is None:
+            return
+        if closed:
+            driver.quit()
+        else:
+            self._idle.put(driver)
+
+    def _is_alive(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Lease a warm driver, falling back to a cold launch when the pool is empty"""
+        driver = None
+        while driver is None:
+            try:
+                candidate = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_alive(candidate):
+                driver = candidate
+            else:
+                try:
+                    candidate.quit()
+                except Exception:
+                    pass
+        self._refill()
+        if driver is None:
+            driver = self._launch()
+        return driver
+
+    def shutdown(self):
+        """Quit every idle driver and stop refilling"""
+        with self.lock:
+            self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                driver.quit()
+            except Exception:
+                pass
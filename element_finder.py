@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+from urllib.parse import urlparse
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.common.by import By
+from metrics import registry
+
+# Candidate selectors per element role, most specific first
+ROLE_SELECTORS = {
+    "search_box": ["input[type='search']", "input[name='q']", "input[name='query']", "input[name='search']", "#search", ".search-input", ".search-box"],
+    "add_to_cart": ["#add-to-cart-button", ".add-to-cart", ".buy-now", ".btn-add-to-cart", ".cart-button", ".add-to-cart-button"],
+    "checkout": ["[name*='checkout']", ".checkout-button", ".proceed-to-checkout", ".btn-checkout", "#checkout"],
+    "address": ["[name*='address']", "#address", ".address-field", "#address-line1"],
+    "email": ["[name*='email']", "#email", ".email-field"],
+    "password": ["[name*='password']", "#password", ".password-field"],
+    "signin": ["[name*='login']", "#signInSubmit", ".signin-button", ".login-button"],
+    "card_number": ["[name*='card']", "#card-number", ".card-number", ".payment-field"],
+}
+
+SELECTOR_LOOKUPS = registry.counter("shopping_agent_selector_lookups_total", "Element lookups by whether the learned selector matched", ["result"])
+
+
+class ElementFinder:
+    """Finds elements by role with short explicit waits, remembering which selector worked on each domain"""
+
+    def __init__(self, path=None, timeout=None, learned_timeout=None):
+        self.path = path if path is not None else os.getenv("SELECTOR_CACHE_PATH", "selector_cache.json")
+        self.timeout = timeout if timeout is not None else float(os.getenv("ELEMENT_WAIT_TIMEOUT", "5"))
+        self.learned_timeout = learned_timeout if learned_timeout is not None else float(os.getenv("LEARNED_SELECTOR_TIMEOUT", "1"))
+        self.lock = threading.Lock()
+        self.learned = self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable selector cache {self.path}: {str(e)}")
+            return {}
+
+    def _save(self):
+        # Caller holds self.lock; write-then-rename so a crash never leaves half a file
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self.learned, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not save selector cache: {str(e)}")
+
+    @staticmethod
+    def domain(driver):
+        host = urlparse(driver.current_url).hostname or ""
+        return host[4:] if host.startswith("www.") else host
+
+    def remember(self, domain, role, selector):
+        with self.lock:
+            if self.learned.get(domain, {}).get(role) == selector:
+                return
+            self.learned.setdefault(domain, {})[role] = selector
+            self._save()
+
+    def forget(self, domain, role):
+        with self.lock:
+            if self.learned.get(domain, {}).pop(role, None) is not None:
+                self._save()
+
+    def wait_for(self, driver, by, value, timeout=None):
+        """First element matching (by, value), polling until timeout"""
+        # Imported here: the selenium wait module pulls in the remote driver stack (~0.2 s)
+        from selenium.webdriver.support.ui import WebDriverWait
+        found = WebDriverWait(driver, self.timeout if timeout is None else timeout, poll_frequency=0.1).until(
+            lambda d: d.find_elements(by, value) or False
+        )
+        return found[0]
+
+    def find_by_id(self, driver, element_id):
+        try:
+            return self.wait_for(driver, By.ID, element_id)
+        except TimeoutException:
+            raise NoSuchElementException(f"No element with id '{element_id}' on {driver.current_url}")
+
+    def find(self, driver, role, candidates=None):
+        """Element for role, trying this domain's learned selector before the full candidate list"""
+        candidates = candidates or ROLE_SELECTORS[role]
+        domain = self.domain(driver)
+        learned = self.learned.get(domain, {}).get(role)
+        if learned:
+            try:
+                element = self.wait_for(driver, By.CSS_SELECTOR, learned, self.learned_timeout)
+                SELECTOR_LOOKUPS.inc("hit")
+                return element
+            except TimeoutException:
+                pass
+        SELECTOR_LOOKUPS.inc("miss")
+        # One wait on the whole union, then cheap lookups to learn which candidate matched
+        try:
+            self.wait_for(driver, By.CSS_SELECTOR, ", ".join(candidates))
+        except TimeoutException:
+            if learned:
+                # The learned selector matched nothing here; stop paying its wait on every lookup
+                self.forget(domain, role)
+            raise NoSuchElementException(f"No {role} element on {domain or driver.current_url} (tried {', '.join(candidates)})")
+        for selector in candidates:
+            found = driver.find_elements(By.CSS_SELECTOR, selector)
+            if found:
+                self.remember(domain, role, selector)
+                return found[0]
+        raise NoSuchElementException(f"No {role} element on {domain or driver.current_url}")
+
+
+element_finder = ElementFinder()
@@ -1,3 +1,3 @@
-from cryptography.fernet import Fernet
-key = Fernet.generate_key()
+from cryptography.fernet import Fernet
+key = Fernet.generate_key()
 print(key.decode())
\ No newline at end of file
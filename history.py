@@ -0,0 +1,115 @@
+import os
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage, RemoveMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+SUMMARY_PROMPT = (
+    "Summarize this shopping-assistant conversation for your own later reference. "
+    "Keep the user's goals, products, prices, retailers, URLs and any decisions made. "
+    "Never include stored personal information such as passwords or card numbers. "
+    "Reply with the summary only."
+)
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+TRUNCATED_MARKER = " ...[truncated]"
+
+
+def estimate_tokens(messages):
+    """Rough token count (about four characters per token)"""
+    total = 0
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        total += len(content) // 4 + 4
+        for call in getattr(message, "tool_calls", None) or []:
+            total += len(str(call.get("args", ""))) // 4 + 4
+    return total
+
+
+def is_summary(message):
+    return isinstance(message, SystemMessage) and message.additional_kwargs.get("conversation_summary", False)
+
+
+class ConversationWindow:
+    """Keeps a message history under a token budget with a rolling summary of older turns"""
+
+    def __init__(self, model=None, max_tokens=None, tool_output_chars=None):
+        self.model = model
+        self.max_tokens = max_tokens or int(os.getenv("HISTORY_TOKEN_BUDGET", "6000"))
+        self.tool_output_chars = tool_output_chars or int(os.getenv("HISTORY_TOOL_OUTPUT_CHARS", "300"))
+
+    def _last_human_index(self, messages):
+        for index in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[index], HumanMessage):
+                return index
+        return 0
+
+    def shrink_tool_outputs(self, messages):
+        """Truncate tool results from earlier turns; the model has already used them"""
+        current_turn = self._last_human_index(messages)
+        shrunk = []
+        for index, message in enumerate(messages):
+            content = message.content
+            # Already-truncated results are left alone so a compacted thread compares equal and isn't rewritten
+            if (index < current_turn and isinstance(message, ToolMessage) and isinstance(content, str)
+                    and len(content) > self.tool_output_chars and not content.endswith(TRUNCATED_MARKER)):
+                keep = max(self.tool_output_chars - len(TRUNCATED_MARKER), 0)
+                message = message.model_copy(update={"content": content[:keep] + TRUNCATED_MARKER})
+            shrunk.append(message)
+        return shrunk
+
+    def _split(self, messages):
+        # Keep the most recent turns that fit in half the budget, cutting only at a user message
+        # so tool calls stay paired with their results
+        budget = self.max_tokens // 2
+        used = 0
+        cut = len(messages)
+        for index in range(len(messages) - 1, -1, -1):
+            used += estimate_tokens([messages[index]])
+            if used > budget:
+                break
+            cut = index
+        while cut < len(messages) and not isinstance(messages[cut], HumanMessage):
+            cut += 1
+        if cut >= len(messages):
+            cut = self._last_human_index(messages)
+        return messages[:cut], messages[cut:]
+
+    def summarize(self, previous, messages):
+        """Fold messages into the previous summary text"""
+        transcript = "\n".join(
+            f"{message.type}: {message.content if isinstance(message.content, str) else message.content!s}"
+            for message in messages
+        )
+        if previous:
+            transcript = f"Earlier summary: {previous}\n{transcript}"
+        if self.model is not None:
+            try:
+                response = self.model.invoke([SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=transcript)])
+                return response.content if isinstance(response.content, str) else str(response.content)
+            except Exception as e:
+                print(f"History summarization failed: {str(e)}")
+        # Without a model keep a clipped transcript rather than losing the context outright
+        return transcript[-self.max_tokens:]
+
+    def compact(self, messages):
+        """Return messages fitted to the budget, summarizing older turns into one system message"""
+        messages = self.shrink_tool_outputs(list(messages))
+        if estimate_tokens(messages) <= self.max_tokens:
+            return messages
+        previous = None
+        if messages and is_summary(messages[0]):
+            previous = messages[0].content[len(SUMMARY_PREFIX):]
+            messages = messages[1:]
+        older, recent = self._split(messages)
+        summary = self.summarize(previous, older) if older else previous
+        if not summary:
+            return recent
+        return [SystemMessage(content=SUMMARY_PREFIX + summary, additional_kwargs={"conversation_summary": True})] + recent
+
+    def pre_model_hook(self, state):
+        """create_react_agent hook that compacts the checkpointed thread before each model call"""
+        messages = state["messages"]
+        compacted = self.compact(messages)
+        if len(compacted) == len(messages) and all(a is b for a, b in zip(compacted, messages)):
+            return {"llm_input_messages": messages}
+        # Rewrite the stored thread so the summary and trimmed tool outputs persist
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *compacted]}
@@ -0,0 +1,217 @@
+import asyncio
+import os
+import threading
+import weakref
+import httpx
+from rate_limit import limiter
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+SERPER_URL = os.getenv("SERPER_URL", "https://google.serper.dev/search")
+
+# Alternative Tavily endpoint, e.g. the offline benchmark's fake API
+TAVILY_API_URL = os.getenv("TAVILY_API_URL")
+
+limiter.register_api("serper", SERPER_URL)
+
+TIMEOUT = httpx.Timeout(
+    float(os.getenv("HTTP_READ_TIMEOUT", "15")),
+    connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+)
+
+# Stop reading a page body after this many downloaded bytes
+MAX_BODY_BYTES = int(os.getenv("HTTP_MAX_BODY_BYTES", str(1024 * 1024)))
+
+LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=30,
+)
+
+
+def _http2_available():
+    try:
+        import h2
+        return True
+    except ImportError:
+        return False
+
+
+HTTP2 = _http2_available()
+
+class _ReleasingStream(httpx.SyncByteStream):
+    # Holds the host slot until the body has been read or the response closed
+    def __init__(self, stream, release):
+        self.stream = stream
+        self.release = release
+
+    def __iter__(self):
+        yield from self.stream
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            release, self.release = self.release, None
+            if release is not None:
+                release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, release):
+        self.stream = stream
+        self.release = release
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self.stream.aclose()
+        finally:
+            release, self.release = self.release, None
+            if release is not None:
+                release()
+
+
+def _limited_response(key, response, stream):
+    if response.status_code in (429, 503):
+        limiter.slow_down(key, response.headers.get("retry-after"))
+    return httpx.Response(
+        status_code=response.status_code,
+        headers=response.headers,
+        stream=stream,
+        extensions=response.extensions,
+    )
+
+
+class LimitedTransport(httpx.BaseTransport):
+    """Sends each request once its API or site has a free slot and a rate token"""
+
+    def __init__(self, transport):
+        self.transport = transport
+
+    def handle_request(self, request):
+        key = limiter.key_for(request.url)
+        limiter.acquire(key)
+        try:
+            response = self.transport.handle_request(request)
+        except BaseException:
+            limiter.release(key)
+            raise
+        return _limited_response(key, response, _ReleasingStream(response.stream, lambda: limiter.release(key)))
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncLimitedTransport(httpx.AsyncBaseTransport):
+    """Async variant of LimitedTransport"""
+
+    def __init__(self, transport):
+        self.transport = transport
+
+    async def handle_async_request(self, request):
+        key = limiter.key_for(request.url)
+        await limiter.acquire_async(key)
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            limiter.release(key)
+            raise
+        return _limited_response(key, response, _AsyncReleasingStream(response.stream, lambda: limiter.release(key)))
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+_lock = threading.Lock()
+_client = None
+# AsyncClient connections belong to the loop that opened them, so keep one per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _client_options():
+    return dict(
+        headers=DEFAULT_HEADERS,
+        timeout=TIMEOUT,
+        follow_redirects=True,
+    )
+
+
+def get_client():
+    """Process-wide pooled HTTP client"""
+    global _client
+    with _lock:
+        if _client is None:
+            # Pool limits and HTTP/2 belong to the transport once we supply our own
+            transport = LimitedTransport(httpx.HTTPTransport(limits=LIMITS, http2=HTTP2))
+            _client = httpx.Client(transport=transport, **_client_options())
+        return _client
+
+
+def get_async_client():
+    """Pooled async HTTP client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            transport = AsyncLimitedTransport(httpx.AsyncHTTPTransport(limits=LIMITS, http2=HTTP2))
+            client = httpx.AsyncClient(transport=transport, **_client_options())
+            _async_clients[loop] = client
+        return client
+
+
+def tavily_client():
+    """TavilyClient for the configured endpoint"""
+    from tavily import TavilyClient
+    if TAVILY_API_URL:
+        return TavilyClient(api_key=os.getenv("TAVILY_API_KEY"), api_base_url=TAVILY_API_URL)
+    return TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+
+
+def async_tavily_client():
+    """AsyncTavilyClient for the configured endpoint"""
+    from tavily import AsyncTavilyClient
+    if TAVILY_API_URL:
+        return AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"), api_base_url=TAVILY_API_URL)
+    return AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+
+
+def fetch_page(url, max_bytes=None):
+    """GET url and return (status code, body text) read up to max_bytes"""
+    if max_bytes is None:
+        max_bytes = MAX_BODY_BYTES
+    parts = []
+    with get_client().stream("GET", url) as response:
+        for text in response.iter_text():
+            parts.append(text)
+            if response.num_bytes_downloaded >= max_bytes:
+                break
+    return response.status_code, "".join(parts)
+
+
+async def fetch_page_async(url, max_bytes=None):
+    """Async variant of fetch_page"""
+    if max_bytes is None:
+        max_bytes = MAX_BODY_BYTES
+    parts = []
+    async with get_async_client().stream("GET", url) as response:
+        async for text in response.aiter_text():
+            parts.append(text)
+            if response.num_bytes_downloaded >= max_bytes:
+                break
+    return response.status_code, "".join(parts)
+
+
+def close_clients():
+    """Close the shared sync client"""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
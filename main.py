@@ -1,66 +1,110 @@
-import os
-from dotenv import load_dotenv
-from agent import agent_executor
-from langchain_core.messages import HumanMessage, AIMessage
-from session_manager import session_manager
-import time
-
-def run_agent():
-    load_dotenv()
-    A
-    conversation_history = []
-    thread_id = "default_thread"
-    session_id = "default_session"
-    
-    print("AI Automation Agent Ready! Type 'exit' to quit")
-    print("I can securely store your personal info and purchase items from any e-commerce site!")
-    print("Example: 'Store my name as John Doe, email as john@example.com, phone as 123-456-7890'")
-    print("Example: 'Store my address as 123 Main St, City, State, ZIP'")
-    print("Example: 'Store my credit card as 1234-5678-9012-3456'")
-    print("Example: 'Store my password as mypassword123'")
-    print("Example: 'Buy a laptop on Amazon'")
-    print("Example: 'Buy a TV on BestBuy'")
-    print("Example: 'Buy a phone on Walmart'")
-    
-    while True:
-        user_input = input("\nYou: ")
-        if user_input.lower() in ["exit", "quit"]:
-
-            session_manager.close_session(session_id)
-            break
-            
-
-        conversation_history.append(HumanMessage(content=user_input))
-        
-
-        config = {"configurable": {"thread_id": thread_id}}
-        
-        try:
-            response = agent_executor.stream(
-                {"messages": conversation_history, "session_id": session_id},
-                config
-            )
-            
-
-            full_response = ""
-            for chunk in response:
-                if "agent" in chunk:
-                    content = chunk['agent']['messages'][0].content
-                    full_response += content
-                    print(f"Agent: {content}")
-                elif "tools" in chunk:
-                    print(f"Using tools: {list(chunk['tools'].keys())}")
-            
-            conversation_history.append(AIMessage(content=full_response))
-            
-            if len(conversation_history) > 10:
-                conversation_history = conversation_history[-10:]
-                
-        except Exception as e:
-            print(f"Error: {str(e)}")
-
-            conversation_history.append(AIMessage(content=f"Error: {str(e)}"))
-            continue
-
-if __name__ == "__main__":
-    run_agent()
\ No newline at end of file
+import argparse
+import os
+import subprocess
+import sys
+import threading
+from dotenv import load_dotenv
+import agent
+from session_manager import session_manager
+from http_client import close_clients
+from metrics import registry as metrics_registry
+import json
+import time
+
+def profile_startup(top=20):
+    """Print the slowest imports behind `import main`, then the cost of building the model and agent"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    by_package = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            # Attribute each module's own import time to its top-level package
+            package = name.strip().split(".")[0]
+            by_package[package] = by_package.get(package, 0) + int(own)
+            total += int(own)
+    print(f"`import main` took {total / 1000:.1f} ms")
+    print(f"{'ms':>9}  package")
+    for package, micros in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{micros / 1000:9.1f}  {package}")
+
+    print(f"\n{'ms':>9}  on-demand step")
+    for label, step in [("model", agent.get_model), ("checkpointer", agent.get_checkpointer), ("agent", agent.get_agent)]:
+        start = time.perf_counter()
+        try:
+            step()
+            print(f"{(time.perf_counter() - start) * 1000:9.1f}  {label}")
+        except Exception as e:
+            print(f"{'-':>9}  {label}: {str(e)}")
+    session_manager.shutdown()
+
+def run_agent():
+    load_dotenv()
+    thread_id = "default_thread"
+    session_id = "default_session"
+    metrics_registry.serve()
+    session_manager.start()
+    # Build the model and agent while the user reads the banner
+    threading.Thread(target=agent.get_agent, name="agent-warmup", daemon=True).start()
+    
+    print("AI Automation Agent Ready! Type 'exit' to quit")
+    print("I can securely store your personal info and purchase items from any e-commerce site!")
+    print("Example: 'Store my name as John Doe, email as john@example.com, phone as 123-456-7890'")
+    print("Example: 'Store my address as 123 Main St, City, State, ZIP'")
+    print("Example: 'Store my credit card as 1234-5678-9012-3456'")
+    print("Example: 'Store my password as mypassword123'")
+    print("Example: 'Buy a laptop on Amazon'")
+    print("Example: 'Buy a TV on BestBuy'")
+    print("Example: 'Buy a phone on Walmart'")
+    
+    while True:
+        user_input = input("\nYou: ")
+        if user_input.lower() in ["exit", "quit"]:
+
+            session_manager.close_session(session_id)
+            session_manager.shutdown()
+            close_clients()
+            break
+        if user_input.lower() == "metrics":
+            print(json.dumps(metrics_registry.snapshot(), indent=2))
+            continue
+            
+
+
+        config = {"configurable": {"thread_id": thread_id}}
+        
+        try:
+            from streaming import stream_turn
+            # Print tokens as the model writes them; tool progress goes on its own lines
+            speaking = False
+            for kind, text in stream_turn(agent.get_agent(), user_input, config):
+                if kind == "token":
+                    if not speaking:
+                        print("Agent: ", end="")
+                        speaking = True
+                    print(text, end="", flush=True)
+                else:
+                    if speaking:
+                        print()
+                        speaking = False
+                    print(f"  [{text}]")
+            if speaking:
+                print()
+
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            continue
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shopping agent CLI")
+    parser.add_argument("--profile-startup", action="store_true", help="report import and agent construction cost, then exit")
+    args = parser.parse_args()
+    if args.profile_startup:
+        profile_startup()
+    else:
+        run_agent()
\ No newline at end of file
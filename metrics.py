@@ -0,0 +1,261 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_text(labelnames, values):
+    if not labelnames:
+        return ""
+    pairs = []
+    for name, value in zip(labelnames, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(label) for label in labels)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            return {_label_text(self.labelnames, key): value for key, value in self.values.items()}
+
+    def render(self):
+        lines = self.header()
+        for labels, value in self.snapshot().items():
+            lines.append(f"{self.name}{labels} {value}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.functions = {}
+
+    def set(self, value, *labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def set_function(self, func, *labels):
+        """Read the gauge from func() whenever metrics are collected"""
+        key = self._key(labels)
+        with self.lock:
+            self.functions[key] = func
+
+    def snapshot(self):
+        with self.lock:
+            values = dict(self.values)
+            functions = dict(self.functions)
+        for key, func in functions.items():
+            try:
+                values[key] = func()
+            except Exception:
+                continue
+        return {_label_text(self.labelnames, key): value for key, value in values.items()}
+
+    def render(self):
+        lines = self.header()
+        for labels, value in self.snapshot().items():
+            lines.append(f"{self.name}{labels} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, seconds, *labels):
+        key = self._key(labels)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    entry["buckets"][index] += 1
+            entry["count"] += 1
+            entry["sum"] += seconds
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def snapshot(self):
+        with self.lock:
+            entries = {key: {"buckets": list(entry["buckets"]), "count": entry["count"], "sum": entry["sum"]} for key, entry in self.values.items()}
+        result = {}
+        for key, entry in entries.items():
+            count = entry["count"]
+            result[_label_text(self.labelnames, key)] = {
+                "count": count,
+                "sum": round(entry["sum"], 6),
+                "mean": round(entry["sum"] / count, 6) if count else 0.0,
+                "buckets": dict(zip((str(bound) for bound in self.buckets), entry["buckets"])),
+            }
+        return result
+
+    def render(self):
+        lines = self.header()
+        with self.lock:
+            entries = {key: (list(entry["buckets"]), entry["count"], entry["sum"]) for key, entry in self.values.items()}
+        for key, (buckets, count, total) in entries.items():
+            for bound, cumulative in zip(self.buckets, buckets):
+                labels = _label_text(self.labelnames + ("le",), key + (str(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_text(self.labelnames + ("le",), key + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            plain = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{plain} {total}")
+            lines.append(f"{self.name}_count{plain} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.server = None
+
+    def _register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def snapshot(self):
+        """Current value of every metric as plain dicts"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def render_prometheus(self):
+        """Prometheus text exposition format"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=None, host="127.0.0.1"):
+        """Expose /metrics on a local port (METRICS_PORT); safe to call more than once"""
+        if port is None:
+            port = os.getenv("METRICS_PORT")
+        if not port:
+            return None
+        with self.lock:
+            if self.server is not None:
+                return self.server
+            registry = self
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_response(404)
+                        self.end_headers()
+                        return
+                    body = registry.render_prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self.server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+            threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True).start()
+            return self.server
+
+    def stop(self):
+        """Shut the /metrics endpoint down if it is running"""
+        with self.lock:
+            server, self.server = self.server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+registry = MetricsRegistry()
+
+ACTION_SECONDS = registry.histogram("shopping_agent_action_seconds", "Browser action latency by execute_action action", ["action"])
+ACTION_ERRORS = registry.counter("shopping_agent_action_errors_total", "Browser actions that returned an error", ["action"])
+ELEMENT_NOT_FOUND = registry.counter("shopping_agent_element_not_found_total", "Browser actions that could not find their element", ["action"])
+TOOL_SECONDS = registry.histogram("shopping_agent_tool_seconds", "Agent tool latency", ["tool"])
+DRIVER_CREATE_SECONDS = registry.histogram("shopping_agent_driver_create_seconds", "Time to launch and configure a Chrome driver")
+LIVE_SESSIONS = registry.gauge("shopping_agent_live_sessions", "Sessions holding a browser driver")
+POOL_IDLE = registry.gauge("shopping_agent_pool_idle_drivers", "Warm drivers waiting in the pool")
+POOL_PENDING = registry.gauge("shopping_agent_pool_pending_drivers", "Pool drivers currently launching")
+
+
+def _timed(func, name):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with TOOL_SECONDS.time(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _timed_async(func, name):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with TOOL_SECONDS.time(name):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+def instrument_tools(tools):
+    """Record TOOL_SECONDS for every tool's sync and async entry points"""
+    for tool in tools:
+        if getattr(tool, "func", None) is not None:
+            tool.func = _timed(tool.func, tool.name)
+        if getattr(tool, "coroutine", None) is not None:
+            tool.coroutine = _timed_async(tool.coroutine, tool.name)
+    return tools
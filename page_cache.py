@@ -0,0 +1,286 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+from http_client import get_client, get_async_client, MAX_BODY_BYTES
+from metrics import registry
+
+PAGE_CACHE = registry.counter("shopping_agent_page_cache_total", "Scraped page lookups by outcome (fresh, revalidated, miss)", ["result"])
+
+# complete is False when only the start of the page was read (the reader stopped early or the size cap was hit)
+CachedPage = namedtuple("CachedPage", ["text", "fresh", "validators", "complete"])
+
+
+def _http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness(headers, now, default_ttl):
+    """Seconds a 200 response may be served without asking again, or None when it must not be stored"""
+    directives = {}
+    for part in headers.get("cache-control", "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        directives[name] = value.strip('"')
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0
+    age = int(headers["age"]) if headers.get("age", "").isdigit() else 0
+    if directives.get("max-age", "").isdigit():
+        return max(int(directives["max-age"]) - age, 0)
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        date = _http_date(headers.get("date")) or now
+        return max(expires - date - age, 0)
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified is not None:
+        # Heuristic freshness: a tenth of the time since the page last changed, capped at the default
+        return min(max(now - last_modified, 0) / 10, default_ttl)
+    return default_ttl
+
+
+class PageCache:
+    """On-disk cache of fetched page bodies (zlib-compressed) with HTTP validators, evicting least recently used past a byte budget"""
+
+    def __init__(self, path=None, max_bytes=None, default_ttl=None):
+        if path is None:
+            path = os.getenv("PAGE_CACHE_PATH", "page_cache.db")
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("PAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.default_ttl = default_ttl if default_ttl is not None else float(os.getenv("PAGE_CACHE_DEFAULT_TTL", "60"))
+        self.path = path
+        self.lock = threading.Lock()
+        # Opened on first use, so importing this module doesn't create the database files
+        self.db = None
+        self.total = 0
+
+    def _open(self):
+        # Caller holds self.lock
+        if self.db is not None:
+            return
+        # "" keeps the cache in memory for this process only
+        self.db = sqlite3.connect(self.path or ":memory:", check_same_thread=False)
+        if self.path:
+            # Every hit updates last_used; WAL keeps those commits cheap
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS pages "
+            "(url TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, etag TEXT, "
+            "last_modified TEXT, expires_at REAL NOT NULL, last_used REAL NOT NULL, complete INTEGER NOT NULL DEFAULT 1)"
+        )
+        try:
+            self.db.execute("ALTER TABLE pages ADD COLUMN complete INTEGER NOT NULL DEFAULT 1")
+        except sqlite3.OperationalError:
+            pass
+        self.db.commit()
+        self.total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def lookup(self, url):
+        """CachedPage for a cached url, or None"""
+        with self.lock:
+            self._open()
+            row = self.db.execute(
+                "SELECT body, etag, last_modified, expires_at, complete FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE pages SET last_used = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+        body, etag, last_modified, expires_at, complete = row
+        validators = {}
+        if etag:
+            validators["If-None-Match"] = etag
+        if last_modified:
+            validators["If-Modified-Since"] = last_modified
+        return CachedPage(zlib.decompress(body).decode("utf-8"), expires_at > time.time(), validators, bool(complete))
+
+    def store(self, url, text, headers, complete=True):
+        """Save a 200 response body (or just its start, with complete=False) unless its headers forbid it"""
+        now = time.time()
+        ttl = freshness(headers, now, self.default_ttl)
+        if ttl is None:
+            return
+        body = zlib.compress(text.encode("utf-8"), 6)
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            self._open()
+            old = self.db.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages (url, body, size, etag, last_modified, expires_at, last_used, complete) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, body, len(body), headers.get("etag"), headers.get("last-modified"), now + ttl, now, int(complete)),
+            )
+            self.total += len(body) - (old[0] if old else 0)
+            self._evict()
+            self.db.commit()
+
+    def refresh(self, url, headers):
+        """A 304 confirmed the cached copy; extend its lifetime from the new headers"""
+        now = time.time()
+        ttl = freshness(headers, now, self.default_ttl)
+        with self.lock:
+            self._open()
+            if ttl is None:
+                self._delete(url)
+            else:
+                self.db.execute(
+                    "UPDATE pages SET expires_at = ?, last_used = ?, "
+                    "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                    (now + ttl, now, headers.get("etag"), headers.get("last-modified"), url),
+                )
+            self.db.commit()
+
+    def _delete(self, url):
+        # Caller holds self.lock
+        row = self.db.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is not None:
+            self.db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.total -= row[0]
+
+    def _evict(self):
+        # Caller holds self.lock
+        while self.total > self.max_bytes:
+            row = self.db.execute("SELECT url, size FROM pages ORDER BY last_used LIMIT 1").fetchone()
+            if row is None:
+                self.total = 0
+                return
+            self.db.execute("DELETE FROM pages WHERE url = ?", (row[0],))
+            self.total -= row[1]
+
+    def stats(self):
+        with self.lock:
+            self._open()
+            entries = self.db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            return {"entries": entries, "bytes": self.total}
+
+    def clear(self):
+        with self.lock:
+            self._open()
+            self.db.execute("DELETE FROM pages")
+            self.db.commit()
+            self.total = 0
+
+
+page_cache = PageCache()
+
+
+def _unread(text, offset, served):
+    # The part of a chunk starting at offset that the cached prefix hasn't already given the reader
+    return text[max(served - offset, 0):] if offset + len(text) > served else ""
+
+
+def stream_cached(url, max_bytes=None):
+    """GET url and yield decoded body text up to max_bytes, through the page cache: fresh copies skip the network, stale ones are revalidated.
+
+    When the reader stops early only what was read is cached, marked partial; a later reader
+    gets that prefix and the page is fetched again only if it reads past it.
+    """
+    if max_bytes is None:
+        max_bytes = MAX_BODY_BYTES
+    cached = page_cache.lookup(url)
+    served = 0
+    client = get_client()
+    response = None
+    if cached is not None and not cached.fresh:
+        response = client.send(client.build_request("GET", url, headers=cached.validators), stream=True)
+        if response.status_code == 304:
+            response.close()
+            page_cache.refresh(url, response.headers)
+            PAGE_CACHE.inc("revalidated")
+            response = None
+        else:
+            cached = None
+    elif cached is not None:
+        PAGE_CACHE.inc("fresh")
+    if cached is not None:
+        yield cached.text
+        if cached.complete:
+            return
+        served = len(cached.text)
+    if response is None:
+        response = client.send(client.build_request("GET", url), stream=True)
+    PAGE_CACHE.inc("miss")
+    parts = []
+    offset = 0
+    capped = False
+    try:
+        for text in response.iter_text():
+            parts.append(text)
+            unread = _unread(text, offset, served)
+            offset += len(text)
+            if unread:
+                yield unread
+            if response.num_bytes_downloaded >= max_bytes:
+                capped = True
+                break
+    except GeneratorExit:
+        if response.status_code == 200 and offset > served:
+            page_cache.store(url, "".join(parts), response.headers, complete=False)
+        response.close()
+        raise
+    except BaseException:
+        response.close()
+        raise
+    if response.status_code == 200:
+        page_cache.store(url, "".join(parts), response.headers, complete=not capped)
+    response.close()
+
+
+async def stream_cached_async(url, max_bytes=None):
+    """Async variant of stream_cached"""
+    if max_bytes is None:
+        max_bytes = MAX_BODY_BYTES
+    cached = page_cache.lookup(url)
+    served = 0
+    client = get_async_client()
+    response = None
+    if cached is not None and not cached.fresh:
+        response = await client.send(client.build_request("GET", url, headers=cached.validators), stream=True)
+        if response.status_code == 304:
+            await response.aclose()
+            page_cache.refresh(url, response.headers)
+            PAGE_CACHE.inc("revalidated")
+            response = None
+        else:
+            cached = None
+    elif cached is not None:
+        PAGE_CACHE.inc("fresh")
+    if cached is not None:
+        yield cached.text
+        if cached.complete:
+            return
+        served = len(cached.text)
+    if response is None:
+        response = await client.send(client.build_request("GET", url), stream=True)
+    PAGE_CACHE.inc("miss")
+    parts = []
+    offset = 0
+    capped = False
+    try:
+        async for text in response.aiter_text():
+            parts.append(text)
+            unread = _unread(text, offset, served)
+            offset += len(text)
+            if unread:
+                yield unread
+            if response.num_bytes_downloaded >= max_bytes:
+                capped = True
+                break
+    except GeneratorExit:
+        if response.status_code == 200 and offset > served:
+            page_cache.store(url, "".join(parts), response.headers, complete=False)
+        await response.aclose()
+        raise
+    except BaseException:
+        await response.aclose()
+        raise
+    if response.status_code == 200:
+        page_cache.store(url, "".join(parts), response.headers, complete=not capped)
+    await response.aclose()
@@ -0,0 +1,108 @@
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Elements whose content is never visible page text
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe"}
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def make_parser(target):
+    """Feed parser driving target.start/end/data callbacks, lxml when available"""
+    if etree is not None:
+        return etree.HTMLParser(target=target, recover=True)
+    return _StdlibParser(target)
+
+
+class TextExtractor:
+    """Incremental visible-text extractor; feed it HTML as it arrives"""
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.parts = []
+        self.pending = []
+        self.size = 0
+        self.skip_depth = 0
+        self.parser = make_parser(self)
+
+    @property
+    def full(self):
+        return self.size >= self.max_chars
+
+    def feed(self, html):
+        self.parser.feed(html)
+
+    def text(self):
+        self._flush()
+        return "\n".join(self.parts)[:self.max_chars]
+
+    def _flush(self):
+        # Text nodes can arrive split across chunks, so join them at tag boundaries
+        text = " ".join("".join(self.pending).split())
+        self.pending = []
+        if text:
+            self.parts.append(text)
+            self.size += len(text) + 1
+
+    # Parser target callbacks
+    def start(self, tag, attrib=None):
+        self._flush()
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+
+    def end(self, tag):
+        self._flush()
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def data(self, data):
+        if not self.skip_depth and not self.full:
+            self.pending.append(data)
+
+    def close(self):
+        return self.text()
+
+
+def extract_text(chunks, max_chars):
+    """Visible text from an iterable of HTML chunks, stopping once max_chars are collected"""
+    extractor = TextExtractor(max_chars)
+    try:
+        for chunk in chunks:
+            extractor.feed(chunk)
+            if extractor.full:
+                break
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return extractor.text()
+
+
+async def extract_text_async(chunks, max_chars):
+    """Async variant of extract_text for an async iterable of HTML chunks"""
+    extractor = TextExtractor(max_chars)
+    try:
+        async for chunk in chunks:
+            extractor.feed(chunk)
+            if extractor.full:
+                break
+    finally:
+        if hasattr(chunks, "aclose"):
+            await chunks.aclose()
+    return extractor.text()
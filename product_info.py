@@ -0,0 +1,223 @@
+import json
+from typing import Optional
+from pydantic import BaseModel
+from page_text import make_parser
+
+MICRODATA_PROPS = {"name", "price", "priceCurrency", "availability", "brand", "sku", "ratingValue", "reviewCount"}
+
+
+class ProductInfo(BaseModel):
+    url: str
+    name: Optional[str] = None
+    price: Optional[str] = None
+    currency: Optional[str] = None
+    availability: Optional[str] = None
+    brand: Optional[str] = None
+    sku: Optional[str] = None
+    rating: Optional[str] = None
+    review_count: Optional[str] = None
+    image: Optional[str] = None
+    description: Optional[str] = None
+
+    def summary(self):
+        """One-line description for the agent"""
+        if not self.name:
+            return "Could not get product details"
+        parts = [f"Product: {self.name}"]
+        if self.price:
+            parts.append(f"Price: {self.price} {self.currency or ''}".strip())
+        if self.availability:
+            parts.append(f"Availability: {self.availability}")
+        if self.brand:
+            parts.append(f"Brand: {self.brand}")
+        if self.rating:
+            reviews = f" ({self.review_count} reviews)" if self.review_count else ""
+            parts.append(f"Rating: {self.rating}{reviews}")
+        if self.description:
+            parts.append(f"Description: {self.description}")
+        return " | ".join(parts)
+
+
+def _short_enum(value):
+    # schema.org enums arrive as "http://schema.org/InStock"
+    if isinstance(value, str):
+        return value.rstrip("/").rsplit("/", 1)[-1]
+    return value
+
+
+def _text(value):
+    if isinstance(value, dict):
+        value = value.get("name")
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def _find_product(node):
+    if isinstance(node, list):
+        for item in node:
+            found = _find_product(item)
+            if found:
+                return found
+        return None
+    if not isinstance(node, dict):
+        return None
+    types = node.get("@type")
+    if types == "Product" or (isinstance(types, list) and "Product" in types):
+        return node
+    for key in ("@graph", "mainEntity", "itemListElement"):
+        if key in node:
+            found = _find_product(node[key])
+            if found:
+                return found
+    return None
+
+
+class ProductExtractor:
+    """Incremental collector for JSON-LD, OpenGraph and microdata product fields"""
+
+    def __init__(self):
+        self.parser = make_parser(self)
+        self.title_parts = None
+        self.title = None
+        self.meta = {}
+        self.microdata = {}
+        self.itemprop = None
+        self.itemprop_parts = []
+        self.ld_parts = None
+        self.product_ld = None
+        self.head_done = False
+
+    def feed(self, html):
+        self.parser.feed(html)
+
+    @property
+    def enough(self):
+        """True once further bytes are unlikely to add anything the fast path needs"""
+        if self.product_ld is not None:
+            return True
+        if not self.head_done:
+            return False
+        name = self.meta.get("og:title") or self.microdata.get("name")
+        price = self.meta.get("product:price:amount") or self.meta.get("og:price:amount") or self.microdata.get("price")
+        return bool(name and price)
+
+    # Parser target callbacks
+    def start(self, tag, attrib=None):
+        attrib = attrib or {}
+        self._finish_itemprop()
+        if tag == "title" and self.title is None:
+            self.title_parts = []
+        elif tag == "meta":
+            content = attrib.get("content")
+            if content:
+                if attrib.get("itemprop") in MICRODATA_PROPS:
+                    self.microdata.setdefault(attrib["itemprop"], content)
+                key = attrib.get("property") or attrib.get("name")
+                if key:
+                    self.meta.setdefault(key.lower(), content)
+            return
+        elif tag == "script" and attrib.get("type", "").lower() == "application/ld+json":
+            self.ld_parts = []
+        elif tag == "body":
+            self.head_done = True
+        itemprop = attrib.get("itemprop")
+        if itemprop in MICRODATA_PROPS:
+            value = attrib.get("content") or attrib.get("href")
+            if value:
+                self.microdata.setdefault(itemprop, value)
+            else:
+                self.itemprop = itemprop
+
+    def end(self, tag):
+        self._finish_itemprop()
+        if tag == "title" and self.title_parts is not None:
+            self.title = " ".join("".join(self.title_parts).split()) or None
+            self.title_parts = None
+        elif tag == "script" and self.ld_parts is not None:
+            self._finish_ld("".join(self.ld_parts))
+            self.ld_parts = None
+        elif tag == "head":
+            self.head_done = True
+
+    def data(self, data):
+        if self.ld_parts is not None:
+            self.ld_parts.append(data)
+        elif self.title_parts is not None:
+            self.title_parts.append(data)
+        elif self.itemprop is not None:
+            self.itemprop_parts.append(data)
+
+    def close(self):
+        return None
+
+    def _finish_itemprop(self):
+        if self.itemprop is None:
+            return
+        text = " ".join("".join(self.itemprop_parts).split())
+        if text:
+            self.microdata.setdefault(self.itemprop, text)
+            self.itemprop = None
+            self.itemprop_parts = []
+
+    def _finish_ld(self, raw):
+        if self.product_ld is not None:
+            return
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return
+        self.product_ld = _find_product(data)
+
+    def result(self, url):
+        info = ProductInfo(url=url)
+        product = self.product_ld or {}
+        offers = product.get("offers") or {}
+        if isinstance(offers, list):
+            offers = offers[0] if offers else {}
+        rating = product.get("aggregateRating") or {}
+        meta, micro = self.meta, self.microdata
+
+        info.name = _text(product.get("name")) or meta.get("og:title") or micro.get("name") or self.title
+        info.price = _text(offers.get("price") or offers.get("lowPrice")) or meta.get("product:price:amount") or meta.get("og:price:amount") or micro.get("price")
+        info.currency = _text(offers.get("priceCurrency")) or meta.get("product:price:currency") or meta.get("og:price:currency") or micro.get("priceCurrency")
+        info.availability = _short_enum(_text(offers.get("availability")) or meta.get("product:availability") or meta.get("og:availability") or micro.get("availability"))
+        info.brand = _text(product.get("brand")) or meta.get("product:brand") or micro.get("brand")
+        info.sku = _text(product.get("sku")) or micro.get("sku")
+        info.rating = _text(rating.get("ratingValue")) or micro.get("ratingValue")
+        info.review_count = _text(rating.get("reviewCount") or rating.get("ratingCount")) or micro.get("reviewCount")
+        info.image = _text(product.get("image")) or meta.get("og:image")
+        description = _text(product.get("description")) or meta.get("og:description") or meta.get("description")
+        if description:
+            info.description = description[:300]
+        return info
+
+
+def extract_product(chunks, url, fast=True):
+    """ProductInfo from an iterable of HTML chunks; fast mode stops at the head or product JSON-LD"""
+    extractor = ProductExtractor()
+    try:
+        for chunk in chunks:
+            extractor.feed(chunk)
+            if fast and extractor.enough:
+                break
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return extractor.result(url)
+
+
+async def extract_product_async(chunks, url, fast=True):
+    """Async variant of extract_product"""
+    extractor = ProductExtractor()
+    try:
+        async for chunk in chunks:
+            extractor.feed(chunk)
+            if fast and extractor.enough:
+                break
+    finally:
+        if hasattr(chunks, "aclose"):
+            await chunks.aclose()
+    return extractor.result(url)
@@ -0,0 +1,65 @@
+import os
+import time
+from secure_storage import EncryptedRecordStore
+
+
+class ProfileVault(EncryptedRecordStore):
+    """Stores each session's personal info as one encrypted record, optionally persisted to SQLite"""
+
+    def __init__(self, db_path=None, cache_ttl=None):
+        super().__init__("profiles", db_path if db_path is not None else os.getenv("PROFILE_DB"))
+        self.cache_ttl = cache_ttl if cache_ttl is not None else float(os.getenv("PROFILE_CACHE_TTL", "2"))
+        # Decrypted profiles, kept only for the few seconds a tool call or page render needs them
+        self.decrypted = {}
+
+    def _purge_expired(self):
+        # Caller holds self.lock
+        now = time.monotonic()
+        for session_id in [sid for sid, (expiry, _) in self.decrypted.items() if expiry <= now]:
+            del self.decrypted[session_id]
+
+    def _profile(self, session_id):
+        # Caller holds self.lock
+        self._purge_expired()
+        cached = self.decrypted.get(session_id)
+        if cached is not None:
+            return cached[1]
+        profile = self._load(session_id)
+        if profile is None:
+            # Nothing stored: don't cache the miss, or unknown session_ids would pile up
+            return {}
+        self.decrypted[session_id] = (time.monotonic() + self.cache_ttl, profile)
+        return profile
+
+    def purge_expired(self):
+        """Drop decrypted profiles past their TTL, for sessions that haven't been looked up since"""
+        with self.lock:
+            self._purge_expired()
+
+    def has_profile(self, session_id):
+        return self.has_record(session_id)
+
+    def store(self, session_id, info_type, value):
+        """Add or replace one field and re-encrypt the session's record"""
+        with self.lock:
+            profile = dict(self._profile(session_id))
+            profile[info_type] = value
+            self._save(session_id, profile)
+            self.decrypted[session_id] = (time.monotonic() + self.cache_ttl, profile)
+
+    def get_profile(self, session_id, fields=None):
+        """Decrypt the session's record once and return the requested fields (all when fields is None)"""
+        with self.lock:
+            profile = self._profile(session_id)
+        if fields is None:
+            return dict(profile)
+        return {field: profile.get(field) for field in fields}
+
+    def get(self, session_id, info_type):
+        return self.get_profile(session_id, [info_type])[info_type]
+
+    def forget(self, session_id):
+        """Drop the in-memory copies; a persisted record is kept for the next visit"""
+        with self.lock:
+            self.records.pop(session_id, None)
+            self.decrypted.pop(session_id, None)
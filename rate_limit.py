@@ -0,0 +1,299 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+from metrics import registry
+
+RATE_LIMIT_WAIT = registry.histogram("shopping_agent_rate_limit_wait_seconds", "Time outbound calls queued for a host slot and a rate token", ["key"])
+COALESCED = registry.counter("shopping_agent_coalesced_requests_total", "Outbound calls that joined an identical call already in flight", ["key"])
+SLOW_DOWN = registry.counter("shopping_agent_slow_down_responses_total", "429/503 responses that paused their rate limit", ["key"])
+
+
+def _parse_limit(spec):
+    # "rate:burst" in requests per second; a rate of 0 means unlimited
+    rate, _, burst = spec.partition(":")
+    rate = float(rate)
+    return rate, float(burst) if burst else max(rate, 1.0)
+
+
+def _parse_limits(spec):
+    limits = {}
+    for item in spec.split(","):
+        name, _, value = item.strip().partition("=")
+        if name and value:
+            limits[name.strip().lower()] = _parse_limit(value)
+    return limits
+
+
+class _Abandoned(Exception):
+    """The call a coalesced waiter joined was cancelled or interrupted; the waiter should make its own"""
+
+
+class TokenBucket:
+    """rate tokens per second up to burst; callers reserve a token and sleep off any shortfall themselves"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        # Caller holds self.lock
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token and return how many seconds to wait before using it"""
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, seconds):
+        """Hand out no tokens for the next seconds"""
+        if self.rate <= 0:
+            return
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class HostSlots:
+    """Counting semaphore that threads and event loops can both wait on, served first come first served"""
+
+    def __init__(self, size):
+        self.size = size
+        self.used = 0
+        self.waiters = deque()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            if self.used < self.size and not self.waiters:
+                self.used += 1
+                return
+            event = threading.Event()
+            self.waiters.append(event.set)
+        event.wait()
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if self.used < self.size and not self.waiters:
+                self.used += 1
+                return
+            future = loop.create_future()
+            self.waiters.append(lambda: loop.call_soon_threadsafe(self._hand_over, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Cancelled after the slot was handed to us but before we resumed: give it back
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def _hand_over(self, future):
+        # A waiter cancelled while queued still got the slot; pass it on
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self):
+        with self.lock:
+            if not self.waiters:
+                self.used -= 1
+                return
+            # The slot goes straight to the next waiter, so used stays the same
+            wake = self.waiters.popleft()
+        wake()
+
+
+class RateLimiter:
+    """Token buckets and concurrency slots per external API or site domain, plus single-flight for identical calls"""
+
+    def __init__(self, limits=None, domain_limit=None, concurrency=None):
+        self.limits = limits if limits is not None else _parse_limits(os.getenv("RATE_LIMITS", "serper=5:10,tavily=5:10,openai=3:5"))
+        self.domain_limit = domain_limit if domain_limit is not None else _parse_limit(os.getenv("DOMAIN_RATE_LIMIT", "2:5"))
+        self.concurrency = concurrency if concurrency is not None else int(os.getenv("HOST_CONCURRENCY", "4"))
+        self.api_urls = {}
+        self.buckets = {}
+        self.slots = {}
+        self.inflight = {}
+        self.lock = threading.Lock()
+
+    def register_api(self, name, base_url):
+        """Count requests under base_url against the name API's limits rather than its host's"""
+        self.api_urls[name] = base_url
+
+    def key_for(self, url):
+        """Limit key for a URL: a registered API's name, else the site domain without www."""
+        url = str(url)
+        for name, base_url in self.api_urls.items():
+            if base_url and url.startswith(base_url):
+                return name
+        host = (urlparse(url).hostname or "").lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def _label(self, key):
+        # Site domains are open-ended, so only named limits get their own metric label
+        return key if key in self.limits else "domain"
+
+    def _state(self, key):
+        with self.lock:
+            if key not in self.buckets:
+                self.buckets[key] = TokenBucket(*self.limits.get(key, self.domain_limit))
+                self.slots[key] = HostSlots(self.concurrency) if self.concurrency > 0 else None
+            return self.buckets[key], self.slots[key]
+
+    def acquire(self, key):
+        """Block until key has a free slot and a token; pair with release(key)"""
+        start = time.perf_counter()
+        bucket, slots = self._state(key)
+        if slots is not None:
+            slots.acquire()
+        try:
+            delay = bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+        except BaseException:
+            if slots is not None:
+                slots.release()
+            raise
+        RATE_LIMIT_WAIT.observe(time.perf_counter() - start, self._label(key))
+
+    async def acquire_async(self, key):
+        """Async variant of acquire"""
+        start = time.perf_counter()
+        bucket, slots = self._state(key)
+        if slots is not None:
+            await slots.acquire_async()
+        try:
+            delay = bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            # Cancelled while waiting for a token: nothing downstream will release the slot
+            if slots is not None:
+                slots.release()
+            raise
+        RATE_LIMIT_WAIT.observe(time.perf_counter() - start, self._label(key))
+
+    def release(self, key):
+        _, slots = self._state(key)
+        if slots is not None:
+            slots.release()
+
+    @contextmanager
+    def limit(self, key):
+        self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release(key)
+
+    @asynccontextmanager
+    async def limit_async(self, key):
+        await self.acquire_async(key)
+        try:
+            yield
+        finally:
+            self.release(key)
+
+    def slow_down(self, key, retry_after=None):
+        """The server pushed back: stop handing out key's tokens for Retry-After seconds (default 5)"""
+        seconds = float(retry_after) if retry_after and str(retry_after).isdigit() else 5.0
+        bucket, _ = self._state(key)
+        bucket.pause(seconds)
+        SLOW_DOWN.inc(self._label(key))
+
+    def _join(self, request_key):
+        # (future, owner): the in-flight future for request_key, creating it if we are first
+        with self.lock:
+            future = self.inflight.get(request_key)
+            if future is not None:
+                return future, False
+            future = self.inflight[request_key] = Future()
+            # Running futures can't be cancelled, so a cancelled async waiter can't break it for the others
+            future.set_running_or_notify_cancel()
+            return future, True
+
+    def _settle(self, request_key, future, result=None, error=None):
+        # Resolve and drop the entry under one lock, so no caller can slip in between and start a duplicate
+        with self.lock:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+            self.inflight.pop(request_key, None)
+
+    def coalesce(self, key, request_key, func):
+        """Run func, or if an identical request_key is already in flight, wait for its result instead"""
+        while True:
+            future, owner = self._join(request_key)
+            if owner:
+                break
+            COALESCED.inc(self._label(key))
+            try:
+                return future.result()
+            except _Abandoned:
+                continue
+        try:
+            result = func()
+        except Exception as e:
+            self._settle(request_key, future, error=e)
+            raise
+        except BaseException:
+            # Interrupted, not failed: waiters retry rather than inherit it
+            self._settle(request_key, future, error=_Abandoned())
+            raise
+        self._settle(request_key, future, result)
+        return result
+
+    async def coalesce_async(self, key, request_key, func):
+        """Async variant of coalesce; func returns an awaitable"""
+        while True:
+            future, owner = self._join(request_key)
+            if owner:
+                break
+            COALESCED.inc(self._label(key))
+            try:
+                return await asyncio.wrap_future(future)
+            except _Abandoned:
+                continue
+        try:
+            result = await func()
+        except Exception as e:
+            self._settle(request_key, future, error=e)
+            raise
+        except BaseException:
+            self._settle(request_key, future, error=_Abandoned())
+            raise
+        self._settle(request_key, future, result)
+        return result
+
+    def call(self, key, request_key, func):
+        """Rate-limited, coalesced func() for clients that don't go through the shared HTTP transport"""
+        def limited():
+            with self.limit(key):
+                return func()
+        return self.coalesce(key, request_key, limited)
+
+    async def acall(self, key, request_key, func):
+        """Async variant of call"""
+        async def limited():
+            async with self.limit_async(key):
+                return await func()
+        return await self.coalesce_async(key, request_key, limited)
+
+
+limiter = RateLimiter()
@@ -0,0 +1,364 @@
+import asyncio
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote_plus, urljoin
+from http_client import fetch_page, fetch_page_async
+from rate_limit import limiter
+from page_text import SKIP_TAGS, make_parser
+from search_cache import search_cache
+from session_manager import session_manager
+
+# Search results page for each retailer; {query} is URL-encoded
+SEARCH_URLS = {
+    "amazon": "https://www.amazon.com/s?k={query}",
+    "bestbuy": "https://www.bestbuy.com/site/searchpage.jsp?st={query}",
+    "walmart": "https://www.walmart.com/search?q={query}",
+    "ebay": "https://www.ebay.com/sch/i.html?_nkw={query}",
+    "target": "https://www.target.com/s?searchTerm={query}",
+    "costco": "https://www.costco.com/CatalogSearch?keyword={query}",
+    "newegg": "https://www.newegg.com/p/pl?d={query}",
+    "daraz": "https://www.daraz.pk/catalog/?q={query}",
+}
+
+PRICE_PATTERN = re.compile(r"(\$|£|€|₹|Rs\.?|PKR)\s?(\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)")
+
+# Price symbols as ISO codes, so offers are only ranked against others in the same currency
+CURRENCY_CODES = {"$": "USD", "£": "GBP", "€": "EUR", "₹": "INR", "Rs": "PKR", "Rs.": "PKR", "PKR": "PKR"}
+
+# Phrases that mean we got a bot wall instead of results
+CHALLENGE_MARKERS = ("captcha", "robot check", "are you a human", "unusual traffic", "press & hold", "access denied")
+
+OFFERS_PER_RETAILER = int(os.getenv("OFFERS_PER_RETAILER", "5"))
+COMPARE_WORKERS = int(os.getenv("COMPARE_WORKERS", "4"))
+BROWSER_FALLBACK = os.getenv("COMPARE_BROWSER_FALLBACK", "1") == "1"
+
+_executor = ThreadPoolExecutor(max_workers=COMPARE_WORKERS, thread_name_prefix="compare")
+
+
+def search_url(retailer, query):
+    return SEARCH_URLS[retailer].format(query=quote_plus(query))
+
+
+def looks_blocked(status, html):
+    """True for bot challenges and error pages that a real browser might get past"""
+    if status in (403, 429, 503):
+        return True
+    head = html[:20000].lower()
+    return any(marker in head for marker in CHALLENGE_MARKERS)
+
+
+def parse_price(text):
+    """(currency, amount) for the first price in text, or None"""
+    match = PRICE_PATTERN.search(text or "")
+    if not match:
+        return None
+    return match.group(1), float(match.group(2).replace(",", ""))
+
+
+def _ld_products(node):
+    if isinstance(node, list):
+        for item in node:
+            yield from _ld_products(item)
+        return
+    if not isinstance(node, dict):
+        return
+    types = node.get("@type")
+    if types == "Product" or (isinstance(types, list) and "Product" in types):
+        yield node
+        return
+    for key in ("@graph", "itemListElement", "item", "mainEntity"):
+        if key in node:
+            yield from _ld_products(node[key])
+
+
+class OfferExtractor:
+    """Parser target pairing product links on a results page with the first price after them"""
+
+    def __init__(self, base_url, limit=OFFERS_PER_RETAILER):
+        self.base_url = base_url
+        self.limit = limit
+        self.offers = []
+        self.seen = set()
+        self.pending = []
+        self.skip_depth = 0
+        self.link = None
+        self.candidate = None
+        self.ld = None
+
+    def _add(self, title, url, currency, amount):
+        if len(self.offers) >= self.limit or url in self.seen:
+            return
+        self.seen.add(url)
+        self.offers.append({"title": title, "url": url, "currency": currency, "price": amount})
+
+    def _flush(self):
+        # Text nodes can arrive split, so only look at them at tag boundaries
+        text = " ".join("".join(self.pending).split())
+        self.pending = []
+        if not text:
+            return
+        if self.link is not None:
+            self.link["parts"].append(text)
+        elif self.candidate is not None:
+            price = parse_price(text)
+            if price:
+                self._add(self.candidate["title"], self.candidate["url"], *price)
+                self.candidate = None
+
+    # Parser target callbacks
+    def start(self, tag, attrib=None):
+        attrib = attrib or {}
+        if self.ld is not None or self.skip_depth:
+            if tag in SKIP_TAGS:
+                self.skip_depth += 1
+            return
+        self._flush()
+        if tag == "script" and (attrib.get("type") or "").lower() == "application/ld+json":
+            self.ld = []
+        elif tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == "a" and attrib.get("href") and self.link is None:
+            self.link = {"url": urljoin(self.base_url, attrib["href"]), "parts": []}
+
+    def end(self, tag):
+        if self.ld is not None and tag == "script":
+            self._end_ld()
+            return
+        if self.skip_depth:
+            if tag in SKIP_TAGS:
+                self.skip_depth -= 1
+            return
+        self._flush()
+        if tag == "a" and self.link is not None:
+            link, self.link = self.link, None
+            title = " ".join(link["parts"])
+            price = parse_price(title)
+            if price:
+                # Whole product card wrapped in one link
+                title = PRICE_PATTERN.split(title, 1)[0].strip()
+                if len(title) >= 8:
+                    self._add(title, link["url"], *price)
+            elif len(title) >= 12 and link["url"] not in self.seen:
+                # Short links ("See options", "4.5 stars") don't replace the product we're pricing
+                self.candidate = {"title": title, "url": link["url"]}
+
+    def _end_ld(self):
+        raw, self.ld = "".join(self.ld), None
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return
+        for product in _ld_products(data):
+            offers = product.get("offers") or {}
+            if isinstance(offers, list):
+                offers = offers[0] if offers else {}
+            price = offers.get("price") or offers.get("lowPrice")
+            if not product.get("name") or price is None:
+                continue
+            try:
+                amount = float(str(price).replace(",", ""))
+            except ValueError:
+                continue
+            url = urljoin(self.base_url, product.get("url") or offers.get("url") or "")
+            self._add(str(product["name"]).strip(), url, offers.get("priceCurrency") or "", amount)
+
+    def data(self, data):
+        if self.ld is not None:
+            self.ld.append(data)
+        elif not self.skip_depth:
+            self.pending.append(data)
+
+    def close(self):
+        self._flush()
+        return self.offers
+
+
+def parse_offers(html, base_url, limit=OFFERS_PER_RETAILER):
+    """Offers found on a search results page"""
+    extractor = OfferExtractor(base_url, limit)
+    parser = make_parser(extractor)
+    parser.feed(html)
+    parser.close()
+    return extractor.offers
+
+
+def _relevant(html, url, query):
+    # Results pages carry plenty of priced links unrelated to the query; parse extra and keep matches
+    offers = parse_offers(html, url, OFFERS_PER_RETAILER * 4)
+    words = [word for word in query.lower().split() if len(word) > 2]
+    if words:
+        offers = [offer for offer in offers if any(word in offer["title"].lower() for word in words)]
+    return offers[:OFFERS_PER_RETAILER]
+
+
+def _browser_offers(retailer, url, query, session_id=None):
+    # Without a caller's session, one long-lived browser per retailer so repeat fallbacks skip the cold start
+    session_id = session_id or f"compare-{retailer}"
+    # Shared sessions: hold the lock across both calls so another comparison can't navigate away before the read
+    with session_manager.session_lock(session_id):
+        result = session_manager.execute_action(session_id, "navigate", url)
+        if result.startswith("Error"):
+            raise RuntimeError(result)
+        html = session_manager.execute_action(session_id, "get_page_source")
+    return _relevant(html, url, query)
+
+
+def search_offers(retailer, query, browser_fallback=BROWSER_FALLBACK, session_id=None):
+    """Offers for query on one retailer: plain HTTP first, the browser (session_id's, if given) for bot walls and JS-only pages"""
+    key = search_cache.make_key("offers", query, retailer=retailer)
+    offers = search_cache.get(key)
+    if offers is not None:
+        return offers
+    url = search_url(retailer, query)
+    # Two sessions comparing the same product share one fetch per retailer
+    status, html = limiter.coalesce(retailer, url, lambda: fetch_page(url))
+    offers = [] if looks_blocked(status, html) else _relevant(html, url, query)
+    if not offers and browser_fallback:
+        offers = _browser_offers(retailer, url, query, session_id)
+    for offer in offers:
+        offer["retailer"] = retailer
+    if offers:
+        search_cache.set(key, offers)
+    return offers
+
+
+async def search_offers_async(retailer, query, browser_fallback=BROWSER_FALLBACK):
+    """Async variant of search_offers; the browser fallback runs in a worker thread"""
+    key = search_cache.make_key("offers", query, retailer=retailer)
+    offers = search_cache.get(key)
+    if offers is not None:
+        return offers
+    url = search_url(retailer, query)
+    status, html = await limiter.coalesce_async(retailer, url, lambda: fetch_page_async(url))
+    offers = [] if looks_blocked(status, html) else _relevant(html, url, query)
+    if not offers and browser_fallback:
+        offers = await asyncio.to_thread(_browser_offers, retailer, url, query)
+    for offer in offers:
+        offer["retailer"] = retailer
+    if offers:
+        search_cache.set(key, offers)
+    return offers
+
+
+def iter_offers(query, retailers=None):
+    """Yield (retailer, offers, error) as each retailer answers; retailers=None searches them all"""
+    if retailers is None:
+        retailers = list(SEARCH_URLS)
+    futures = {_executor.submit(search_offers, retailer, query): retailer for retailer in retailers}
+    for future in as_completed(futures):
+        retailer = futures[future]
+        try:
+            yield retailer, future.result(), None
+        except Exception as e:
+            yield retailer, [], str(e)
+
+
+async def iter_offers_async(query, retailers=None):
+    """Async variant of iter_offers, at most COMPARE_WORKERS retailers in flight"""
+    if retailers is None:
+        retailers = list(SEARCH_URLS)
+    limit = asyncio.Semaphore(COMPARE_WORKERS)
+
+    async def one(retailer):
+        async with limit:
+            try:
+                return retailer, await search_offers_async(retailer, query), None
+            except Exception as e:
+                return retailer, [], str(e)
+
+    for next_done in asyncio.as_completed([one(retailer) for retailer in retailers]):
+        yield await next_done
+
+
+def currency_code(currency):
+    return CURRENCY_CODES.get(currency, currency)
+
+
+def rank_offers(offers, max_results=10):
+    """Cheapest first within each currency, most common currency first, dropping repeats of a listing (same URL, or same retailer, title and price)"""
+    groups = {}
+    for offer in offers:
+        groups.setdefault(currency_code(offer["currency"]), []).append(offer)
+    ranked = []
+    for code in sorted(groups, key=lambda code: -len(groups[code])):
+        cheapest = []
+        seen = set()
+        for offer in sorted(groups[code], key=lambda offer: offer["price"]):
+            title_key = (offer["retailer"], " ".join(re.findall(r"\w+", offer["title"].lower())), offer["price"])
+            if offer["url"] in seen or title_key in seen:
+                continue
+            seen.update([offer["url"], title_key])
+            cheapest.append(offer)
+        ranked.extend(cheapest[:max_results])
+    return ranked
+
+
+def price_text(offer):
+    """Offer price with its currency, e.g. $899.00 or 1,299.00 USD"""
+    currency = offer["currency"]
+    if currency.isalpha() and len(currency) > 1:
+        return f"{offer['price']:,.2f} {currency}"
+    return f"{currency}{offer['price']:,.2f}"
+
+
+def format_offers(query, offers, failures):
+    if not offers:
+        lines = [f"No offers found for '{query}'"]
+    else:
+        lines = [f"Offers for '{query}', cheapest first:"]
+        mixed = len({currency_code(offer["currency"]) for offer in offers}) > 1
+        code = None
+        for index, offer in enumerate(offers, 1):
+            if mixed and currency_code(offer["currency"]) != code:
+                code = currency_code(offer["currency"])
+                lines.append(f"Prices in {code}:")
+            lines.append(f"{index}. {price_text(offer)} - {offer['title']} ({offer['retailer']}) {offer['url']}")
+    if failures:
+        lines.append("No results from: " + ", ".join(f"{retailer} ({reason})" for retailer, reason in failures))
+    return "\n".join(lines)
+
+
+def _progress_writer():
+    # Inside a LangGraph run this feeds stream_mode="custom"; elsewhere partial results are dropped
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except Exception:
+        return lambda chunk: None
+
+
+def _split_retailers(retailers):
+    # None means every retailer; an all-unknown list must not fall back to that
+    if not retailers:
+        return None, []
+    known = [retailer.lower() for retailer in retailers if retailer.lower() in SEARCH_URLS]
+    unknown = [(retailer, "unknown retailer") for retailer in retailers if retailer.lower() not in SEARCH_URLS]
+    return known, unknown
+
+
+def compare_prices(query, retailers=None, max_results=10):
+    """Search several retailers at once and return their offers merged, deduplicated and ranked"""
+    writer = _progress_writer()
+    retailers, failures = _split_retailers(retailers)
+    offers = []
+    for retailer, found, error in iter_offers(query, retailers):
+        offers.extend(found)
+        if error or not found:
+            failures.append((retailer, error or "no matches"))
+        writer({"compare_prices": {"retailer": retailer, "offers": found, "error": error}})
+    return format_offers(query, rank_offers(offers, max_results), failures)
+
+
+async def compare_prices_async(query, retailers=None, max_results=10):
+    """Async variant of compare_prices"""
+    writer = _progress_writer()
+    retailers, failures = _split_retailers(retailers)
+    offers = []
+    async for retailer, found, error in iter_offers_async(query, retailers):
+        offers.extend(found)
+        if error or not found:
+            failures.append((retailer, error or "no matches"))
+        writer({"compare_prices": {"retailer": retailer, "offers": found, "error": error}})
+    return format_offers(query, rank_offers(offers, max_results), failures)
@@ -0,0 +1,62 @@
+import atexit
+import threading
+import agent
+from http_client import close_clients
+from metrics import registry as metrics_registry
+from session_manager import session_manager
+
+_lock = threading.Lock()
+_runtime = None
+
+
+class AgentRuntime:
+    """Model, agent, checkpointer and browser sessions shared by every rerun and user of a process"""
+
+    def __init__(self, tools):
+        self.tools = tools
+        self.session_manager = session_manager
+        # Browsers warm up while the model and agent are built
+        session_manager.start()
+        self.lock = threading.Lock()
+        self._agent = None
+        self.closed = False
+        # Local Prometheus endpoint when METRICS_PORT is set
+        metrics_registry.serve()
+
+    @property
+    def model(self):
+        return agent.get_model()
+
+    @property
+    def checkpointer(self):
+        return agent.get_checkpointer()
+
+    @property
+    def agent(self):
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Agent runtime has been shut down")
+            if self._agent is None:
+                self._agent = agent.build_agent(self.model, self.checkpointer, agent_tools=self.tools)
+            return self._agent
+
+    def shutdown(self):
+        """Quit every browser and release clients, the checkpoint database and the metrics port"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        self.session_manager.shutdown()
+        close_clients()
+        metrics_registry.stop()
+        agent.close_checkpointer()
+
+
+def get_runtime(tools):
+    """The process-wide runtime; tools only matter for the call that creates it"""
+    global _runtime
+    with _lock:
+        if _runtime is None:
+            _runtime = AgentRuntime(tools)
+            atexit.register(_runtime.shutdown)
+        return _runtime
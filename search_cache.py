@@ -0,0 +1,93 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class SearchCache:
+    """TTL + LRU cache for paid search API responses, optionally backed by SQLite"""
+
+    def __init__(self, ttl=None, max_entries=None, db_path=None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("SEARCH_CACHE_TTL", "900"))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("SEARCH_CACHE_SIZE", "512"))
+        if db_path is None:
+            db_path = os.getenv("SEARCH_CACHE_DB")
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self.db.commit()
+
+    @staticmethod
+    def make_key(source, query, **params):
+        """Cache key from the API name, the normalized query and any call parameters"""
+        normalized = " ".join(query.lower().split())
+        return json.dumps([source, normalized, sorted(params.items())])
+
+    def get(self, key):
+        """Return the cached response for key, or None on a miss"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+            if self.db is not None:
+                row = self.db.execute(
+                    "SELECT value, expires_at FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """Cache a JSON-serializable API response"""
+        expires_at = time.time() + self.ttl
+        with self.lock:
+            self._remember(key, expires_at, value)
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                self.db.execute("DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),))
+                self.db.commit()
+
+    def _remember(self, key, expires_at, value):
+        # Caller holds self.lock
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            if self.db is not None:
+                self.db.execute("DELETE FROM search_cache")
+                self.db.commit()
+
+
+search_cache = SearchCache()
@@ -1,21 +1,71 @@
-from cryptography.fernet import Fernet
-import base64
-import os
-
-class SecureStorage:
-    def __init__(self):
-        key = os.getenv("ENCRYPTION_KEY")
-        if not key:
-            key = Fernet.generate_key()
-            print(f"Set ENCRYPTION_KEY in .env: {key.decode()}")
-        self.cipher = Fernet(key.encode() if isinstance(key, str) else key)
-    
-    def encrypt(self, data):
-        """Encrypt personal data"""
-        return self.cipher.encrypt(data.encode()).decode()
-    
-    def decrypt(self, encrypted_data):
-        """Decrypt personal data"""
-        return self.cipher.decrypt(encrypted_data.encode()).decode()
-
-secure_storage = SecureStorage()
\ No newline at end of file
+from cryptography.fernet import Fernet
+import base64
+import json
+import os
+import sqlite3
+import threading
+
+class SecureStorage:
+    def __init__(self):
+        key = os.getenv("ENCRYPTION_KEY")
+        if not key:
+            key = Fernet.generate_key()
+            print(f"Set ENCRYPTION_KEY in .env: {key.decode()}")
+        self.cipher = Fernet(key.encode() if isinstance(key, str) else key)
+    
+    def encrypt(self, data):
+        """Encrypt personal data"""
+        return self.cipher.encrypt(data.encode()).decode()
+    
+    def decrypt(self, encrypted_data):
+        """Decrypt personal data"""
+        return self.cipher.decrypt(encrypted_data.encode()).decode()
+
+secure_storage = SecureStorage()
+
+
+class EncryptedRecordStore:
+    """One encrypted JSON record per session, kept in memory and optionally persisted to a SQLite table"""
+
+    def __init__(self, table, db_path=None):
+        self.table = table
+        self.records = {}
+        self.lock = threading.Lock()
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(f"CREATE TABLE IF NOT EXISTS {table} (session_id TEXT PRIMARY KEY, record TEXT NOT NULL)")
+            self.db.commit()
+
+    def _record(self, session_id):
+        # Caller holds self.lock
+        if session_id not in self.records and self.db is not None:
+            row = self.db.execute(f"SELECT record FROM {self.table} WHERE session_id = ?", (session_id,)).fetchone()
+            if row is not None:
+                self.records[session_id] = row[0]
+        return self.records.get(session_id)
+
+    def _load(self, session_id):
+        # Caller holds self.lock; the decrypted record, or None if nothing was saved
+        record = self._record(session_id)
+        return json.loads(secure_storage.decrypt(record)) if record else None
+
+    def _save(self, session_id, value):
+        # Caller holds self.lock
+        record = secure_storage.encrypt(json.dumps(value))
+        self.records[session_id] = record
+        if self.db is not None:
+            self.db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (session_id, record) VALUES (?, ?)",
+                (session_id, record),
+            )
+            self.db.commit()
+
+    def has_record(self, session_id):
+        with self.lock:
+            return self._record(session_id) is not None
+
+    def forget(self, session_id):
+        """Drop the in-memory copy; a persisted record is kept for the next visit"""
+        with self.lock:
+            self.records.pop(session_id, None)
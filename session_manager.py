@@ -1,176 +1,402 @@
-import threading
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import Select
-from secure_storage import secure_storage
-import requests
-from bs4 import BeautifulSoup
-import time
-from fake_useragent import UserAgent
-
-class BrowserSessionManager:
-    def __init__(self):
-        self.sessions = {}
-        self.personal_info = {}
-        self.lock = threading.Lock()
-    
-    def get_session(self, session_id):
-        with self.lock:
-            if session_id not in self.sessions:
-                options = uc.ChromeOptions()
-                options.add_argument("--headless")
-
-                options.add_argument("--disable-web-security")
-                options.add_argument("--allow-running-insecure-content")
-                options.add_argument("--disable-extensions")
-                options.add_argument("--no-sandbox")
-                options.add_argument("--disable-dev-shm-usage")
-                options.add_argument("--disable-gpu")
-                options.add_argument("--remote-debugging-port=9222")
-
-                options.add_argument("--disable-blink-features=AutomationControlled")
-                options.add_experimental_option("excludeSwitches", ["enable-automation"])
-                options.add_experimental_option('useAutomationExtension', False)
-
-                ua = UserAgent()
-                user_agent = ua.random
-                options.add_argument(f"--user-agent={user_agent}")
-                
-
-                driver = uc.Chrome(options=options, use_subprocess=False)
-
-                driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-                self.sessions[session_id] = driver
-            return self.sessions[session_id]
-    
-    def store_personal_info(self, session_id, info_type, value):
-        """Securely store personal information"""
-        encrypted_value = secure_storage.encrypt(value)
-        if session_id not in self.personal_info:
-            self.personal_info[session_id] = {}
-        self.personal_info[session_id][info_type] = encrypted_value
-    
-    def get_personal_info(self, session_id, info_type):
-        """Retrieve personal information"""
-        if session_id in self.personal_info and info_type in self.personal_info[session_id]:
-            encrypted_value = self.personal_info[session_id][info_type]
-            return secure_storage.decrypt(encrypted_value)
-        return None
-    
-    def close_session(self, session_id):
-        with self.lock:
-            if session_id in self.sessions:
-                self.sessions[session_id].quit()
-                del self.sessions[session_id]
-            if session_id in self.personal_info:
-                del self.personal_info[session_id]
-    
-    def execute_action(self, session_id, action, *args, **kwargs):
-        driver = self.get_session(session_id)
-        try:
-            if action == "navigate":
-                driver.get(args[0])
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-                return f"Navigated to {args[0]}, title: {driver.title}"
-            elif action == "fill_form":
-                field = driver.find_element(By.ID, args[0])
-                field.clear()
-                field.send_keys(args[1])
-                return f"Filled field '{args[0]}' with '{args[1]}'"
-            elif action == "click_element":
-                element = driver.find_element(By.ID, args[0])
-                element.click()
-                return f"Clicked element '{args[0]}'"
-            elif action == "search_product":
-                search_box = driver.find_element(By.CSS_SELECTOR, "input[type='search'], input[name='q'], input[name='query'], input[name='search'], #search, .search-input, .search-box")
-                search_box.clear()
-                search_box.send_keys(args[0])
-                search_box.send_keys(Keys.RETURN)
-                return f"Searched for '{args[0]}' on current site"
-            elif action == "add_to_cart":
-
-                add_to_cart_button = driver.find_element(By.CSS_SELECTOR, "#add-to-cart-button, .add-to-cart, .buy-now, .btn-add-to-cart, .cart-button, .add-to-cart-button")
-                add_to_cart_button.click()
-                return "Added product to cart"
-            elif action == "proceed_to_checkout":
-
-                checkout_button = driver.find_element(By.CSS_SELECTOR, "[name*='checkout'], .checkout-button, .proceed-to-checkout, .btn-checkout, #checkout")
-                checkout_button.click()
-                return "Proceeded to checkout"
-            elif action == "fill_address":
-                address_field = driver.find_element(By.CSS_SELECTOR, "[name*='address'], #address, .address-field, #address-line1")
-                address_field.send_keys(args[0])
-                return f"Filled address with {args[0]}"
-            elif action == "fill_email":
-                email_field = driver.find_element(By.CSS_SELECTOR, "[name*='email'], #email, .email-field")
-                email_field.send_keys(args[0])
-                return f"Filled email with {args[0]}"
-            elif action == "fill_password":
-                password_field = driver.find_element(By.CSS_SELECTOR, "[name*='password'], #password, .password-field")
-                password_field.send_keys(args[0])
-                return f"Filled password"
-            elif action == "click_signin":
-                signin_button = driver.find_element(By.CSS_SELECTOR, "[name*='login'], #signInSubmit, .signin-button, .login-button")
-                signin_button.click()
-                return "Clicked sign in"
-            elif action == "fill_payment_info":
-                card_number_field = driver.find_element(By.CSS_SELECTOR, "[name*='card'], #card-number, .card-number, .payment-field")
-                card_number_field.send_keys(args[0])
-                return f"Filled card number"
-            elif action == "get_title":
-                return driver.title
-            elif action == "get_url":
-                return driver.current_url
-            else:
-                return f"Unknown action: {action}"
-        except Exception as e:
-            return f"Error in {action}: {str(e)}"
-
-def search_products(product_name, website="Amazon"):
-    """Search for products using Tavily API (works with any e-commerce site) - FIXED"""
-    try:
-        from tavily import TavilyClient
-        client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-        
-        query = f"buy {product_name} on {website}"
-        response = client.search(query, max_results=5)
-        
-
-        if 'results' in response and len(response['results']) > 0:
-            products = []
-            for result in response['results'][:3]:
-                if 'content' in result and result['content']:
-                    products.append(result['content'][:200])
-            if products:
-                return f"Products found: {', '.join(products)}"
-        
-        return f"No products found for '{product_name}' on {website}"
-    except Exception as e:
-        return f"Error searching for products: {str(e)}"
-
-def get_product_details(url):
-    """Get product details from any e-commerce URL - FIXED"""
-    try:
-
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept-Language': 'en-US,en;q=0.9',
-        }
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        title = soup.find('title')
-        if title:
-            return f"Product: {title.get_text(strip=True)}"
-        else:
-            return "Could not get product details"
-    except Exception as e:
-        return f"Error getting product details: {str(e)}"
-
-
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import NoSuchElementException
+from profile_vault import ProfileVault
+from session_state import SessionStateStore, capture, restore
+import time
+from driver_pool import DriverPool
+from http_client import tavily_client, async_tavily_client
+from page_cache import stream_cached, stream_cached_async
+from rate_limit import limiter
+from product_info import extract_product, extract_product_async
+from search_cache import search_cache
+from element_finder import element_finder
+import metrics
+
+class BrowserSessionManager:
+    def __init__(self):
+        self.sessions = {}
+        self.profiles = ProfileVault()
+        # Cookies, storage and URL per session, so a replacement browser picks up where the last one stopped
+        self.states = SessionStateStore()
+        self.snapshot_actions = {name for name in os.getenv("SESSION_SNAPSHOT_ACTIONS", "navigate,click_element,click_signin").split(",") if name}
+        self.auto_restore = os.getenv("SESSION_AUTO_RESTORE", "1") == "1"
+        # Guards the session dicts only; never held while a browser launches
+        self.lock = threading.Lock()
+        self.session_locks = {}
+        self.launching = {}
+        self.launcher = ThreadPoolExecutor(
+            max_workers=int(os.getenv("DRIVER_LAUNCH_WORKERS", "4")),
+            thread_name_prefix="driver-launch",
+        )
+        # Fast-load profile: eager page loads, images/media/fonts/ad hosts blocked over CDP
+        self.fast_load = os.getenv("FAST_PAGE_LOAD", "1") == "1"
+        self.page_load_strategy = os.getenv("PAGE_LOAD_STRATEGY", "eager" if self.fast_load else "normal")
+        self.navigate_timeout = float(os.getenv("NAVIGATE_TIMEOUT", "10"))
+        # BROWSER_WORKERS > 0 moves drivers into that many worker processes; workers themselves run drivers in-process
+        self.workers = int(os.getenv("BROWSER_WORKERS", "0"))
+        self.router = None
+        self.pool = DriverPool(
+            size=0 if self.workers else None,
+            fast_load=self.fast_load,
+            page_load_strategy=self.page_load_strategy,
+        )
+        # Sessions ordered from least to most recently used
+        self.last_used = OrderedDict()
+        self.idle_ttl = float(os.getenv("SESSION_IDLE_TTL", "1800"))
+        self.max_sessions = int(os.getenv("MAX_SESSIONS", "20"))
+        self.evict_hooks = []
+        self.stop_reaper = threading.Event()
+        self.reap_interval = float(os.getenv("SESSION_REAP_INTERVAL", "60"))
+        self.reaper = threading.Thread(target=self._reap_loop, name="session-reaper", daemon=True)
+        self.started = False
+        metrics.LIVE_SESSIONS.set_function(lambda: self.router.session_count() if self.router else len(self.sessions))
+    
+    def start(self):
+        """Warm the driver pool and start the reaper; a no-op after the first call"""
+        # Not done at import, so importing this module (or `main --profile-startup`) never launches Chrome
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+        self.pool.start()
+        self.reaper.start()
+    
+    @property
+    def remote(self):
+        """Router to the browser worker processes, started on first use; None when drivers run in-process"""
+        # Not started at import: spawned children re-import the parent's main module before they know they're children
+        if self.workers and self.router is None:
+            with self.lock:
+                if self.router is None:
+                    from browser_workers import WorkerRouter
+                    self.router = WorkerRouter(self.workers)
+            self.start()
+        return self.router
+    
+    def run_in_process(self):
+        """Own drivers here rather than routing to workers; called by each browser worker process"""
+        self.workers = 0
+        self.pool.size = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+        self.start()
+    
+    def _touch(self, session_id):
+        # Caller holds self.lock
+        self.last_used[session_id] = time.monotonic()
+        self.last_used.move_to_end(session_id)
+    
+    def add_evict_hook(self, hook):
+        """Register hook(session_id, driver), called before a session's driver is quit"""
+        self.evict_hooks.append(hook)
+    
+    def session_lock(self, session_id):
+        """Lock serializing driver use within one session"""
+        with self.lock:
+            if session_id not in self.session_locks:
+                self.session_locks[session_id] = threading.RLock()
+            return self.session_locks[session_id]
+    
+    def get_session_future(self, session_id):
+        """Return a future resolving to the session's driver without blocking on its launch"""
+        self.start()
+        with self.lock:
+            self._touch(session_id)
+            if session_id in self.sessions:
+                future = Future()
+                future.set_result(self.sessions[session_id])
+                return future
+            if session_id not in self.launching:
+                future = Future()
+                self.launching[session_id] = future
+                self.launcher.submit(self._launch, session_id, future)
+            return self.launching[session_id]
+    
+    def _launch(self, session_id, future):
+        try:
+            driver = self.pool.acquire()
+        except Exception as e:
+            with self.lock:
+                if self.launching.get(session_id) is future:
+                    del self.launching[session_id]
+            future.set_exception(e)
+            return
+        if self.auto_restore and self.states.has_state(session_id):
+            # The session had a browser before (released or crashed): bring back its logins and page
+            try:
+                restore(driver, self.states.load(session_id))
+            except Exception as e:
+                print(f"Could not restore browser state for session {session_id}: {str(e)}")
+        with self.lock:
+            wanted = self.launching.get(session_id) is future
+            if wanted:
+                del self.launching[session_id]
+                self.sessions[session_id] = driver
+        if not wanted:
+            driver.quit()
+            future.set_exception(RuntimeError(f"Session {session_id} was closed while its browser was starting"))
+            return
+        future.set_result(driver)
+        self._enforce_cap()
+    
+    def get_session(self, session_id):
+        return self.get_session_future(session_id).result()
+    
+    def store_personal_info(self, session_id, info_type, value):
+        """Securely store personal information"""
+        with self.lock:
+            self._touch(session_id)
+        self.profiles.store(session_id, info_type, value)
+    
+    def get_personal_info(self, session_id, info_type):
+        """Retrieve personal information"""
+        return self.get_profile(session_id, [info_type])[info_type]
+    
+    def get_profile(self, session_id, fields=None):
+        """Retrieve several personal info fields with a single decrypt"""
+        if self.profiles.has_profile(session_id):
+            with self.lock:
+                self._touch(session_id)
+        return self.profiles.get_profile(session_id, fields)
+    
+    def close_session(self, session_id):
+        self._drop(session_id, keep_info=False)
+    
+    def release_driver(self, session_id):
+        """Quit the session's browser but keep its stored info"""
+        self._drop(session_id, keep_info=True)
+    
+    def _drop(self, session_id, keep_info):
+        if self.workers:
+            if self.router:
+                self.router.close_session(session_id, keep_info=keep_info)
+            if not keep_info:
+                with self.lock:
+                    self.profiles.forget(session_id)
+                    self.session_locks.pop(session_id, None)
+                    self.last_used.pop(session_id, None)
+            return
+        with self.session_lock(session_id):
+            with self.lock:
+                driver = self.sessions.pop(session_id, None)
+                self.launching.pop(session_id, None)
+                if not keep_info:
+                    self.profiles.forget(session_id)
+                    self.states.forget(session_id)
+                    self.session_locks.pop(session_id, None)
+                    self.last_used.pop(session_id, None)
+            if driver is None:
+                return
+            if keep_info:
+                self._snapshot(session_id, driver)
+            for hook in self.evict_hooks:
+                try:
+                    hook(session_id, driver)
+                except Exception as e:
+                    print(f"Evict hook failed for session {session_id}: {str(e)}")
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    
+    def _enforce_cap(self):
+        with self.lock:
+            live = [sid for sid in self.last_used if sid in self.sessions]
+            victims = live[:max(len(live) - self.max_sessions, 0)]
+        for session_id in victims:
+            self.release_driver(session_id)
+    
+    def reap(self):
+        """Close sessions idle past the TTL and trim live drivers to the cap"""
+        cutoff = time.monotonic() - self.idle_ttl
+        with self.lock:
+            idle = [sid for sid, used in self.last_used.items() if used < cutoff]
+        for session_id in idle:
+            self.close_session(session_id)
+        self._enforce_cap()
+        self.profiles.purge_expired()
+    
+    def _reap_loop(self):
+        while not self.stop_reaper.wait(self.reap_interval):
+            try:
+                self.reap()
+            except Exception as e:
+                print(f"Session reaper error: {str(e)}")
+    
+    def shutdown(self):
+        """Close every session and the warm driver pool"""
+        self.stop_reaper.set()
+        for session_id in list(self.last_used if self.router else self.sessions):
+            self.close_session(session_id)
+        self.launcher.shutdown(wait=False)
+        self.pool.shutdown()
+        if self.router:
+            self.router.shutdown()
+    
+    def execute_action(self, session_id, action, *args, **kwargs):
+        if self.remote:
+            with self.lock:
+                self._touch(session_id)
+            with metrics.ACTION_SECONDS.time(action):
+                return self.remote.execute_action(session_id, action, *args, **kwargs)
+        with metrics.ACTION_SECONDS.time(action), self.session_lock(session_id):
+            return self._execute_action(session_id, action, *args, **kwargs)
+    
+    def _snapshot(self, session_id, driver):
+        try:
+            self.states.save(session_id, capture(driver))
+        except Exception as e:
+            print(f"Could not snapshot browser state for session {session_id}: {str(e)}")
+    
+    def _execute_action(self, session_id, action, *args, **kwargs):
+        if action == "restore_state" and self.auto_restore and session_id not in self.sessions and self.states.has_state(session_id):
+            # A fresh driver restores saved state as it launches, so don't restore it twice
+            driver = self.get_session(session_id)
+            return f"Restored session at {driver.current_url}, title: {driver.title}"
+        result = self._run_action(session_id, action, *args, **kwargs)
+        driver = self.sessions.get(session_id)
+        if action in self.snapshot_actions and driver is not None and not result.startswith(f"Error in {action}"):
+            self._snapshot(session_id, driver)
+        return result
+    
+    def _run_action(self, session_id, action, *args, **kwargs):
+        driver = self.get_session(session_id)
+        try:
+            if action == "navigate":
+                with limiter.limit(limiter.key_for(args[0])):
+                    driver.get(args[0])
+                # Wait for the element the caller needs rather than the whole page
+                target = kwargs.get("wait_for") or "body"
+                element_finder.wait_for(driver, By.CSS_SELECTOR, target, self.navigate_timeout)
+                return f"Navigated to {args[0]}, title: {driver.title}"
+            elif action == "fill_form":
+                field = element_finder.find_by_id(driver, args[0])
+                field.clear()
+                field.send_keys(args[1])
+                return f"Filled field '{args[0]}' with '{args[1]}'"
+            elif action == "click_element":
+                element = element_finder.find_by_id(driver, args[0])
+                element.click()
+                return f"Clicked element '{args[0]}'"
+            elif action == "search_product":
+                search_box = element_finder.find(driver, "search_box")
+                search_box.clear()
+                search_box.send_keys(args[0])
+                search_box.send_keys(Keys.RETURN)
+                return f"Searched for '{args[0]}' on current site"
+            elif action == "add_to_cart":
+
+                add_to_cart_button = element_finder.find(driver, "add_to_cart")
+                add_to_cart_button.click()
+                return "Added product to cart"
+            elif action == "proceed_to_checkout":
+
+                checkout_button = element_finder.find(driver, "checkout")
+                checkout_button.click()
+                return "Proceeded to checkout"
+            elif action == "fill_address":
+                address_field = element_finder.find(driver, "address")
+                address_field.send_keys(args[0])
+                return f"Filled address with {args[0]}"
+            elif action == "fill_email":
+                email_field = element_finder.find(driver, "email")
+                email_field.send_keys(args[0])
+                return f"Filled email with {args[0]}"
+            elif action == "fill_password":
+                password_field = element_finder.find(driver, "password")
+                password_field.send_keys(args[0])
+                return f"Filled password"
+            elif action == "click_signin":
+                signin_button = element_finder.find(driver, "signin")
+                signin_button.click()
+                return "Clicked sign in"
+            elif action == "fill_payment_info":
+                card_number_field = element_finder.find(driver, "card_number")
+                card_number_field.send_keys(args[0])
+                return f"Filled card number"
+            elif action == "get_title":
+                return driver.title
+            elif action == "get_url":
+                return driver.current_url
+            elif action == "get_page_source":
+                return driver.page_source
+            elif action == "snapshot_state":
+                self.states.save(session_id, capture(driver))
+                return f"Saved browser state at {driver.current_url}"
+            elif action == "restore_state":
+                state = self.states.load(session_id)
+                if state is None:
+                    return f"No saved browser state for session {session_id}"
+                restore(driver, state)
+                return f"Restored session at {driver.current_url}, title: {driver.title}"
+            else:
+                return f"Unknown action: {action}"
+        except NoSuchElementException as e:
+            metrics.ELEMENT_NOT_FOUND.inc(action)
+            metrics.ACTION_ERRORS.inc(action)
+            return f"Error in {action}: {str(e)}"
+        except Exception as e:
+            metrics.ACTION_ERRORS.inc(action)
+            return f"Error in {action}: {str(e)}"
+
+def _format_products(response, product_name, website):
+    if 'results' in response and len(response['results']) > 0:
+        products = []
+        for result in response['results'][:3]:
+            if 'content' in result and result['content']:
+                products.append(result['content'][:200])
+        if products:
+            return f"Products found: {', '.join(products)}"
+    
+    return f"No products found for '{product_name}' on {website}"
+
+def search_products(product_name, website="Amazon"):
+    """Search for products using Tavily API (works with any e-commerce site) - FIXED"""
+    try:
+        client = tavily_client()
+        
+        query = f"buy {product_name} on {website}"
+        key = search_cache.make_key("tavily", query, max_results=5)
+        response = search_cache.get(key)
+        if response is None:
+            response = limiter.call("tavily", key, lambda: client.search(query, max_results=5))
+            search_cache.set(key, response)
+        return _format_products(response, product_name, website)
+    except Exception as e:
+        return f"Error searching for products: {str(e)}"
+
+async def search_products_async(product_name, website="Amazon"):
+    """Async variant of search_products"""
+    try:
+        client = async_tavily_client()
+        
+        query = f"buy {product_name} on {website}"
+        key = search_cache.make_key("tavily", query, max_results=5)
+        response = search_cache.get(key)
+        if response is None:
+            response = await limiter.acall("tavily", key, lambda: client.search(query, max_results=5))
+            search_cache.set(key, response)
+        return _format_products(response, product_name, website)
+    except Exception as e:
+        return f"Error searching for products: {str(e)}"
+
+def get_product_details(url, fast=True):
+    """Get product details from any e-commerce URL - FIXED"""
+    try:
+        return extract_product(stream_cached(url), url, fast=fast).summary()
+    except Exception as e:
+        return f"Error getting product details: {str(e)}"
+
+async def get_product_details_async(url, fast=True):
+    """Async variant of get_product_details"""
+    try:
+        info = await extract_product_async(stream_cached_async(url), url, fast=fast)
+        return info.summary()
+    except Exception as e:
+        return f"Error getting product details: {str(e)}"
+
+
 session_manager = BrowserSessionManager()
\ No newline at end of file
@@ -0,0 +1,131 @@
+import json
+import os
+from urllib.parse import urlparse
+from secure_storage import EncryptedRecordStore
+
+READ_LOCAL_STORAGE = "return JSON.stringify(Object.assign({}, window.localStorage));"
+WRITE_LOCAL_STORAGE = "var items = arguments[0]; for (var key in items) { window.localStorage.setItem(key, items[key]); }"
+
+
+def origin(url):
+    """scheme://host of an http(s) URL, or None for about:blank, data: and the like"""
+    parts = urlparse(url or "")
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _cookie_matches(cookie, host):
+    domain = (cookie.get("domain") or host).lstrip(".")
+    return host == domain or host.endswith("." + domain)
+
+
+def _cdp_cookie(cookie):
+    # Network.setCookies wants "expires"; WebDriver cookies carry "expiry"
+    param = {key: cookie[key] for key in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite") if cookie.get(key) is not None}
+    expires = cookie.get("expires", cookie.get("expiry"))
+    if expires is not None and expires > 0 and not cookie.get("session"):
+        param["expires"] = expires
+    return param
+
+
+def _webdriver_cookie(cookie):
+    param = {key: cookie[key] for key in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite") if cookie.get(key) is not None}
+    expires = cookie.get("expiry", cookie.get("expires"))
+    if expires is not None and expires > 0 and not cookie.get("session"):
+        param["expiry"] = int(expires)
+    return param
+
+
+def capture(driver):
+    """Read the driver's cookies, the current page's localStorage and its URL"""
+    url = driver.current_url
+    cookies = None
+    every_domain = False
+    if hasattr(driver, "execute_cdp_cmd"):
+        # Chrome hands back every domain's cookies at once; WebDriver only sees the current page's
+        try:
+            cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+            every_domain = True
+        except Exception:
+            cookies = None
+    if cookies is None:
+        cookies = driver.get_cookies()
+    local_storage = {}
+    page_origin = origin(url)
+    if page_origin:
+        try:
+            items = driver.execute_script(READ_LOCAL_STORAGE)
+            if items:
+                local_storage[page_origin] = json.loads(items)
+        except Exception:
+            pass
+    return {"url": url, "cookies": cookies, "every_domain": every_domain, "local_storage": local_storage}
+
+
+def restore(driver, state):
+    """Load saved cookies and storage into a fresh driver and open the saved page"""
+    url = state.get("url")
+    target = origin(url)
+    if target is None:
+        return
+    cookies = [cookie for domain_cookies in state.get("cookies", {}).values() for cookie in domain_cookies]
+    items = state.get("local_storage", {}).get(target)
+    if hasattr(driver, "execute_cdp_cmd"):
+        try:
+            # One page load: cookies go in over CDP and storage is seeded before the page's own scripts run
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": [_cdp_cookie(cookie) for cookie in cookies]})
+            script = None
+            if items:
+                source = f"if (location.origin === {json.dumps(target)}) {{ var items = {json.dumps(items)}; for (var key in items) {{ window.localStorage.setItem(key, items[key]); }} }}"
+                script = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})["identifier"]
+            driver.get(url)
+            if script is not None:
+                driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script})
+            return
+        except Exception as e:
+            print(f"CDP restore unavailable, falling back to WebDriver: {str(e)}")
+    # WebDriver can only set cookies and storage for the page it is on, so land on the origin first
+    driver.get(target)
+    host = urlparse(target).hostname
+    for cookie in cookies:
+        if _cookie_matches(cookie, host):
+            try:
+                driver.add_cookie(_webdriver_cookie(cookie))
+            except Exception:
+                pass
+    if items:
+        driver.execute_script(WRITE_LOCAL_STORAGE, items)
+    driver.get(url)
+
+
+class SessionStateStore(EncryptedRecordStore):
+    """Each session's browser state (cookies by domain, localStorage by origin, last URL) as one encrypted record"""
+
+    def __init__(self, db_path=None):
+        super().__init__("session_state", db_path if db_path is not None else os.getenv("SESSION_STATE_DB"))
+
+    def has_state(self, session_id):
+        return self.has_record(session_id)
+
+    def load(self, session_id):
+        """The session's decrypted state, or None if nothing was saved"""
+        with self.lock:
+            return self._load(session_id)
+
+    def save(self, session_id, snapshot):
+        """Merge a capture() into the session's state, replacing what it saw per domain and origin"""
+        with self.lock:
+            state = self._load(session_id) or {"cookies": {}, "local_storage": {}}
+            host = urlparse(snapshot["url"]).hostname or ""
+            if snapshot.get("every_domain"):
+                state["cookies"] = {}
+            else:
+                # A WebDriver capture sees every cookie that applies to this host, so it replaces all of those
+                state["cookies"] = {domain: cookies for domain, cookies in state["cookies"].items() if not _cookie_matches({"domain": domain}, host)}
+            for cookie in snapshot["cookies"]:
+                state["cookies"].setdefault((cookie.get("domain") or host).lstrip("."), []).append(cookie)
+            state["local_storage"].update(snapshot["local_storage"])
+            if origin(snapshot["url"]):
+                state["url"] = snapshot["url"]
+            self._save(session_id, state)
@@ -0,0 +1,50 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from tool_memo import turn_scope
+
+STREAM_MODES = ["messages", "updates", "custom"]
+
+
+def _text(content):
+    # Gemini can return content as a list of parts
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content or [])
+
+
+def _brief(value, limit=80):
+    text = " ".join(str(value).split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def stream_turn(executor, user_text, config):
+    """Run one user turn, yielding ("token", text) as the model writes and ("tool", line) for tool progress"""
+    with turn_scope(config) as config:
+        yield from _stream_events(executor.stream({"messages": [HumanMessage(content=user_text)]}, config, stream_mode=STREAM_MODES))
+
+
+def _stream_events(stream):
+    for mode, chunk in stream:
+        if mode == "messages":
+            message, metadata = chunk
+            # Only the agent node talks to the user; the history hook's summary calls stay silent
+            if metadata.get("langgraph_node") == "agent" and isinstance(message, AIMessage):
+                text = _text(message.content)
+                if text:
+                    yield "token", text
+        elif mode == "updates":
+            for node, update in chunk.items():
+                if not update:
+                    continue
+                for message in update.get("messages", []) if isinstance(update, dict) else []:
+                    if node == "agent":
+                        for call in getattr(message, "tool_calls", None) or []:
+                            args = ", ".join(f"{key}={_brief(value, 40)}" for key, value in call["args"].items())
+                            yield "tool", f"Calling {call['name']}({args})"
+                    elif node == "tools":
+                        yield "tool", f"{message.name} returned: {_brief(_text(message.content))}"
+        elif mode == "custom" and isinstance(chunk, dict) and "compare_prices" in chunk:
+            progress = chunk["compare_prices"]
+            if progress.get("error"):
+                yield "tool", f"{progress['retailer']}: {_brief(progress['error'])}"
+            else:
+                yield "tool", f"{progress['retailer']}: {len(progress['offers'])} offers"
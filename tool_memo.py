@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import wraps
+from metrics import registry
+from rate_limit import _Abandoned
+
+# Tools that drive the browser or change stored state; repeating them is the point, so never memoize
+SIDE_EFFECT_TOOLS = {"navigate", "fill_form", "click_element", "resume_session", "purchase_product", "store_personal_info", "get_personal_info"}
+
+TOOL_MEMO = registry.counter("shopping_agent_tool_memo_total", "Tool calls answered from the turn memo or joined to an identical call in flight", ["tool", "result"])
+
+_lock = threading.Lock()
+_turns = {}
+
+
+class TurnMemo:
+    """Results of this turn's tool calls, plus calls still in flight so identical ones can wait for them"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.results = {}
+        self.inflight = {}
+
+    def _join(self, name, key):
+        # (future, owner): a memoized result comes back already resolved; otherwise the call in flight, created if we are first
+        with self.lock:
+            if key in self.results:
+                TOOL_MEMO.inc(name, "hit")
+                future = Future()
+                future.set_result(self.results[key])
+                return future, False
+            future = self.inflight.get(key)
+            if future is not None:
+                TOOL_MEMO.inc(name, "coalesced")
+                return future, False
+            future = self.inflight[key] = Future()
+            # Running futures can't be cancelled, so a cancelled async waiter can't break it for the others
+            future.set_running_or_notify_cancel()
+            return future, True
+
+    def _settle(self, key, future, result=None, error=None):
+        # Store, resolve and drop the in-flight entry under one lock, so no identical call can start in between
+        with self.lock:
+            if error is None:
+                # Leave failures out so the model can retry them within the same turn
+                if not (isinstance(result, str) and "error" in result[:60].lower()):
+                    self.results[key] = result
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+            self.inflight.pop(key, None)
+
+    def call(self, name, key, func):
+        while True:
+            future, owner = self._join(name, key)
+            if owner:
+                break
+            try:
+                return future.result()
+            except _Abandoned:
+                continue
+        try:
+            result = func()
+        except Exception as e:
+            self._settle(key, future, error=e)
+            raise
+        except BaseException:
+            # Interrupted, not failed: waiters run the tool themselves rather than inherit it
+            self._settle(key, future, error=_Abandoned())
+            raise
+        self._settle(key, future, result)
+        return result
+
+    async def acall(self, name, key, func):
+        while True:
+            future, owner = self._join(name, key)
+            if owner:
+                break
+            try:
+                return await asyncio.wrap_future(future)
+            except _Abandoned:
+                continue
+        try:
+            result = await func()
+        except Exception as e:
+            self._settle(key, future, error=e)
+            raise
+        except BaseException:
+            self._settle(key, future, error=_Abandoned())
+            raise
+        self._settle(key, future, result)
+        return result
+
+
+@contextmanager
+def turn_scope(config):
+    """Config for one agent turn whose memoized tools share results; the memo is dropped afterwards"""
+    turn_id = uuid.uuid4().hex
+    with _lock:
+        _turns[turn_id] = TurnMemo()
+    try:
+        yield {**config, "configurable": {**config.get("configurable", {}), "turn_id": turn_id}}
+    finally:
+        with _lock:
+            _turns.pop(turn_id, None)
+
+
+def current_memo():
+    """The running turn's memo, or None outside a turn_scope"""
+    try:
+        from langgraph.config import get_config
+        turn_id = get_config().get("configurable", {}).get("turn_id")
+    except RuntimeError:
+        return None
+    with _lock:
+        return _turns.get(turn_id)
+
+
+def _key(name, args, kwargs):
+    return json.dumps([name, args, sorted(kwargs.items())], default=str)
+
+
+def _memoized(func, name):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        memo = current_memo()
+        if memo is None:
+            return func(*args, **kwargs)
+        return memo.call(name, _key(name, args, kwargs), lambda: func(*args, **kwargs))
+    return wrapper
+
+
+def _memoized_async(func, name):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        memo = current_memo()
+        if memo is None:
+            return await func(*args, **kwargs)
+        return await memo.acall(name, _key(name, args, kwargs), lambda: func(*args, **kwargs))
+    return wrapper
+
+
+def memoize_tools(tools, exclude=SIDE_EFFECT_TOOLS):
+    """Answer repeated identical calls within a turn from memory, skipping the excluded side-effecting tools"""
+    for tool in tools:
+        if tool.name in exclude:
+            continue
+        if getattr(tool, "func", None) is not None:
+            tool.func = _memoized(tool.func, tool.name)
+        if getattr(tool, "coroutine", None) is not None:
+            tool.coroutine = _memoized_async(tool.coroutine, tool.name)
+    return tools
@@ -1,203 +1,309 @@
-from langchain.tools import tool
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.keys import Keys
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import requests
-import json
-from pydantic import BaseModel, Field
-from typing import Optional, Type
-import openai
-import os
-from session_manager import session_manager, search_products, get_product_details
-
-
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
-class NavigateInput(BaseModel):
-    url: str = Field(description="URL to navigate to")
-    session_id: str = Field(description="Session ID for persistent browser state")
-
-@tool("navigate", args_schema=NavigateInput)
-def navigate(url: str, session_id: str) -> str:
-    """Navigate to a URL in browser with persistent session"""
-    return session_manager.execute_action(session_id, "navigate", url)
-
-class FillFormInput(BaseModel):
-    session_id: str = Field(description="Session ID for persistent browser state")
-    field_id: str = Field(description="ID of the input field")
-    value: str = Field(description="Value to fill in")
-
-@tool("fill_form", args_schema=FillFormInput)
-def fill_form(session_id: str, field_id: str, value: str) -> str:
-    """Fill a form field on a webpage"""
-    return session_manager.execute_action(session_id, "fill_form", field_id, value)
-
-class ClickElementInput(BaseModel):
-    session_id: str = Field(description="Session ID for persistent browser state")
-    element_id: str = Field(description="ID of the element to click")
-
-@tool("click_element", args_schema=ClickElementInput)
-def click_element(session_id: str, element_id: str) -> str:
-    """Click an element on a webpage"""
-    return session_manager.execute_action(session_id, "click_element", element_id)
-
-class StorePersonalInfoInput(BaseModel):
-    session_id: str = Field(description="Session ID for persistent browser state")
-    info_type: str = Field(description="Type of personal info (email, phone, name, etc.)")
-    value: str = Field(description="Personal information value")
-
-@tool("store_personal_info", args_schema=StorePersonalInfoInput)
-def store_personal_info(session_id: str, info_type: str, value: str) -> str:
-    """Securely store personal information"""
-    session_manager.store_personal_info(session_id, info_type, value)
-    return f"Stored {info_type} securely for session {session_id}"
-
-class GetPersonalInfoInput(BaseModel):
-    session_id: str = Field(description="Session ID for persistent browser state")
-    info_type: str = Field(description="Type of personal info to retrieve")
-
-@tool("get_personal_info", args_schema=GetPersonalInfoInput)
-def get_personal_info(session_id: str, info_type: str) -> str:
-    """Retrieve personal information"""
-    value = session_manager.get_personal_info(session_id, info_type)
-    if value:
-        return f"Retrieved {info_type}: {value}"
-    return f"No {info_type} found for session {session_id}"
-
-class SearchProductInput(BaseModel):
-    product_name: str = Field(description="Name of the product to search for")
-    website: Optional[str] = Field(description="Website to search on (Amazon, BestBuy, etc.)", default="Amazon")
-
-@tool("search_product", args_schema=SearchProductInput)
-def search_product(product_name: str, website: str = "Amazon") -> str:
-    """Search for products using Tavily API (works with any e-commerce site) - FIXED"""
-    return search_products(product_name, website)
-
-class GetProductDetailsInput(BaseModel):
-    url: str = Field(description="URL of the product page")
-
-@tool("get_product_details", args_schema=GetProductDetailsInput)
-def get_product_details(url: str) -> str:
-    """Get product details from any e-commerce URL - FIXED"""
-    return get_product_details(url)
-
-class PurchaseProductInput(BaseModel):
-    session_id: str = Field(description="Session ID for persistent browser state")
-    product_name: str = Field(description="Name of the product to purchase")
-    website: Optional[str] = Field(description="Website to purchase from (Amazon, BestBuy, etc.)", default="Amazon")
-
-@tool("purchase_product", args_schema=PurchaseProductInput)
-def purchase_product(session_id: str, product_name: str, website: str = "Amazon") -> str:
-    """Automate the purchase of a product on any e-commerce site - FIXED"""
-    try:
-
-        email = session_manager.get_personal_info(session_id, "email")
-        phone = session_manager.get_personal_info(session_id, "phone")
-        name = session_manager.get_personal_info(session_id, "name")
-        address = session_manager.get_personal_info(session_id, "address")
-        credit_card = session_manager.get_personal_info(session_id, "credit_card")
-        password = session_manager.get_personal_info(session_id, "password")
-        
-        if not all([email, phone, name, address, credit_card, password]):
-            missing_info = []
-            if not email: missing_info.append("email")
-            if not phone: missing_info.append("phone")
-            if not name: missing_info.append("name")
-            if not address: missing_info.append("address")
-            if not credit_card: missing_info.append("credit card")
-            if not password: missing_info.append("password")
-            
-            return f"Cannot purchase. Missing information: {', '.join(missing_info)}. Please provide this information first."
-        
-        website_urls = {
-            "amazon": "https://www.amazon.com",
-            "bestbuy": "https://www.bestbuy.com",
-            "walmart": "https://www.walmart.com",
-            "ebay": "https://www.ebay.com",
-            "target": "https://www.target.com",
-            "costco": "https://www.costco.com",
-            "newegg": "https://www.newegg.com",
-            "daraz": "https://www.daraz.pk"  
-        }
-        
-        website_lower = website.lower()
-        if website_lower in website_urls:
-            session_manager.execute_action(session_id, "navigate", website_urls[website_lower])
-        else:
-
-            session_manager.execute_action(session_id, "navigate", website_urls["amazon"])
-
-        session_manager.execute_action(session_id, "search_product", product_name)
-        
-
-        return f"Would purchase {product_name} from {website} for {name}. The actual purchase would involve: logging in with {email}, proceeding to checkout, using stored shipping address ({address}) and payment method (ending in {credit_card[-4:]}). This is a simulation - no actual purchase was made."
-    except Exception as e:
-        return f"Error during purchase process: {str(e)}"
-
-class ScrapeInput(BaseModel):
-    url: str = Field(description="URL to scrape content from")
-
-@tool("scrape", args_schema=ScrapeInput)
-def scrape(url: str) -> str:
-    """Scrape content from a webpage - FIXED"""
-    try:
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        response = session.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        text = soup.get_text()
-        return text[:2000] 
-    except Exception as e:
-        return f"Error scraping {url}: {str(e)}"
-
-@tool("web_search")
-def web_search(query: str) -> str:
-    """Search the web using Serper API - FIXED"""
-    try:
-        url = "https://google.serper.dev/search"
-        payload = json.dumps({
-            "q": query
-        })
-        headers = {
-            'X-API-KEY': os.getenv("SERPER_API_KEY"),
-            'Content-Type': 'application/json'
-        }
-
-        session = requests.Session()
-        response = session.post(url, headers=headers, data=payload)
-        results = response.json()
-        return str(results.get("organic", [])[:3])
-    except Exception as e:
-        return f"Serper search error: {str(e)}"
-
-@tool("tavily_search")
-def tavily_search(query: str) -> str:
-    """Search using Tavily API - FIXED"""
-    try:
-        from tavily import TavilyClient
-        client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-        response = client.search(query, max_results=3)
-        return str(response)
-    except Exception as e:
-        return f"Tavily search error: {str(e)}"
-
-@tool("openai_completion")
-def openai_completion(prompt: str) -> str:
-    """Generate text using OpenAI API"""
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"OpenAI error: {str(e)}"
-
-tools = [navigate, fill_form, click_element, store_personal_info, get_personal_info, search_product, get_product_details, purchase_product, scrape, web_search, tavily_search, openai_completion]
\ No newline at end of file
+from langchain_core.tools import StructuredTool, tool
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import os
+from http_client import get_client, get_async_client, tavily_client, async_tavily_client, SERPER_URL
+from page_text import extract_text, extract_text_async
+from page_cache import stream_cached, stream_cached_async
+from rate_limit import limiter
+from search_cache import search_cache
+from metrics import instrument_tools
+from tool_memo import memoize_tools
+from retailers import compare_prices as fetch_price_comparison, compare_prices_async as fetch_price_comparison_async, search_offers, price_text
+from session_manager import session_manager, search_products, search_products_async, get_product_details as fetch_product_details, get_product_details_async
+
+class NavigateInput(BaseModel):
+    url: str = Field(description="URL to navigate to")
+    session_id: str = Field(description="Session ID for persistent browser state")
+    wait_for: str = Field(default="", description="Optional CSS selector to wait for instead of the full page load")
+
+@tool("navigate", args_schema=NavigateInput)
+def navigate(url: str, session_id: str, wait_for: str = "") -> str:
+    """Navigate to a URL in browser with persistent session"""
+    return session_manager.execute_action(session_id, "navigate", url, wait_for=wait_for)
+
+class FillFormInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+    field_id: str = Field(description="ID of the input field")
+    value: str = Field(description="Value to fill in")
+
+@tool("fill_form", args_schema=FillFormInput)
+def fill_form(session_id: str, field_id: str, value: str) -> str:
+    """Fill a form field on a webpage"""
+    return session_manager.execute_action(session_id, "fill_form", field_id, value)
+
+class ClickElementInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+    element_id: str = Field(description="ID of the element to click")
+
+@tool("click_element", args_schema=ClickElementInput)
+def click_element(session_id: str, element_id: str) -> str:
+    """Click an element on a webpage"""
+    return session_manager.execute_action(session_id, "click_element", element_id)
+
+class ResumeSessionInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+
+@tool("resume_session", args_schema=ResumeSessionInput)
+def resume_session(session_id: str) -> str:
+    """Reopen the session's browser where it left off, with its saved logins, cookies and page"""
+    return session_manager.execute_action(session_id, "restore_state")
+
+class StorePersonalInfoInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+    info_type: str = Field(description="Type of personal info (email, phone, name, etc.)")
+    value: str = Field(description="Personal information value")
+
+@tool("store_personal_info", args_schema=StorePersonalInfoInput)
+def store_personal_info(session_id: str, info_type: str, value: str) -> str:
+    """Securely store personal information"""
+    session_manager.store_personal_info(session_id, info_type, value)
+    return f"Stored {info_type} securely for session {session_id}"
+
+class GetPersonalInfoInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+    info_type: str = Field(description="Type of personal info to retrieve")
+
+@tool("get_personal_info", args_schema=GetPersonalInfoInput)
+def get_personal_info(session_id: str, info_type: str) -> str:
+    """Retrieve personal information"""
+    value = session_manager.get_personal_info(session_id, info_type)
+    if value:
+        return f"Retrieved {info_type}: {value}"
+    return f"No {info_type} found for session {session_id}"
+
+class SearchProductInput(BaseModel):
+    product_name: str = Field(description="Name of the product to search for")
+    website: Optional[str] = Field(description="Website to search on (Amazon, BestBuy, etc.)", default="Amazon")
+
+def _search_product(product_name: str, website: str = "Amazon") -> str:
+    return search_products(product_name, website)
+
+async def _search_product_async(product_name: str, website: str = "Amazon") -> str:
+    return await search_products_async(product_name, website)
+
+search_product = StructuredTool.from_function(
+    func=_search_product,
+    coroutine=_search_product_async,
+    name="search_product",
+    description="Search for products using Tavily API (works with any e-commerce site) - FIXED",
+    args_schema=SearchProductInput,
+)
+
+class GetProductDetailsInput(BaseModel):
+    url: str = Field(description="URL of the product page")
+    fast: bool = Field(description="Stop reading once the page head or product JSON-LD has been parsed", default=True)
+
+def _get_product_details(url: str, fast: bool = True) -> str:
+    return fetch_product_details(url, fast)
+
+async def _get_product_details_async(url: str, fast: bool = True) -> str:
+    return await get_product_details_async(url, fast)
+
+get_product_details = StructuredTool.from_function(
+    func=_get_product_details,
+    coroutine=_get_product_details_async,
+    name="get_product_details",
+    description="Get product details from any e-commerce URL - FIXED",
+    args_schema=GetProductDetailsInput,
+)
+
+WEBSITE_URLS = {
+    "amazon": "https://www.amazon.com",
+    "bestbuy": "https://www.bestbuy.com",
+    "walmart": "https://www.walmart.com",
+    "ebay": "https://www.ebay.com",
+    "target": "https://www.target.com",
+    "costco": "https://www.costco.com",
+    "newegg": "https://www.newegg.com",
+    "daraz": "https://www.daraz.pk"  
+}
+
+class PurchaseProductInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+    product_name: str = Field(description="Name of the product to purchase")
+    website: Optional[str] = Field(description="Website to purchase from (Amazon, BestBuy, etc.)", default="Amazon")
+
+@tool("purchase_product", args_schema=PurchaseProductInput)
+def purchase_product(session_id: str, product_name: str, website: str = "Amazon") -> str:
+    """Automate the purchase of a product on any e-commerce site - FIXED"""
+    try:
+
+        profile = session_manager.get_profile(session_id, ["email", "phone", "name", "address", "credit_card", "password"])
+        email = profile["email"]
+        phone = profile["phone"]
+        name = profile["name"]
+        address = profile["address"]
+        credit_card = profile["credit_card"]
+        password = profile["password"]
+        
+        if not all([email, phone, name, address, credit_card, password]):
+            missing_info = []
+            if not email: missing_info.append("email")
+            if not phone: missing_info.append("phone")
+            if not name: missing_info.append("name")
+            if not address: missing_info.append("address")
+            if not credit_card: missing_info.append("credit card")
+            if not password: missing_info.append("password")
+            
+            return f"Cannot purchase. Missing information: {', '.join(missing_info)}. Please provide this information first."
+        
+        website_lower = website.lower()
+        retailer = website_lower if website_lower in WEBSITE_URLS else "amazon"
+
+        # Search over plain HTTP first; the session's browser is only started for bot walls or JS-only results
+        try:
+            offers = search_offers(retailer, product_name, session_id=session_id)
+        except Exception:
+            offers = []
+        if offers:
+            found = f"Found {offers[0]['title']} for {price_text(offers[0])} ({offers[0]['url']}). "
+        else:
+            session_manager.execute_action(session_id, "navigate", WEBSITE_URLS[retailer])
+            session_manager.execute_action(session_id, "search_product", product_name)
+            found = ""
+
+        return f"{found}Would purchase {product_name} from {website} for {name}. The actual purchase would involve: logging in with {email}, proceeding to checkout, using stored shipping address ({address}) and payment method (ending in {credit_card[-4:]}). This is a simulation - no actual purchase was made."
+    except Exception as e:
+        return f"Error during purchase process: {str(e)}"
+
+class ScrapeInput(BaseModel):
+    url: str = Field(description="URL to scrape content from")
+
+def _scrape(url: str) -> str:
+    try:
+        return extract_text(stream_cached(url), 2000)
+    except Exception as e:
+        return f"Error scraping {url}: {str(e)}"
+
+async def _scrape_async(url: str) -> str:
+    try:
+        return await extract_text_async(stream_cached_async(url), 2000)
+    except Exception as e:
+        return f"Error scraping {url}: {str(e)}"
+
+scrape = StructuredTool.from_function(
+    func=_scrape,
+    coroutine=_scrape_async,
+    name="scrape",
+    description="Scrape content from a webpage - FIXED",
+    args_schema=ScrapeInput,
+)
+
+def _serper_headers():
+    return {
+        'X-API-KEY': os.getenv("SERPER_API_KEY"),
+        'Content-Type': 'application/json'
+    }
+
+def _serper_search(query):
+    response = get_client().post(SERPER_URL, headers=_serper_headers(), json={"q": query})
+    response.raise_for_status()
+    return response.json()
+
+async def _serper_search_async(query):
+    response = await get_async_client().post(SERPER_URL, headers=_serper_headers(), json={"q": query})
+    response.raise_for_status()
+    return response.json()
+
+def _web_search(query: str) -> str:
+    try:
+        key = search_cache.make_key("serper", query)
+        results = search_cache.get(key)
+        if results is None:
+            results = limiter.coalesce("serper", key, lambda: _serper_search(query))
+            search_cache.set(key, results)
+        return str(results.get("organic", [])[:3])
+    except Exception as e:
+        return f"Serper search error: {str(e)}"
+
+async def _web_search_async(query: str) -> str:
+    try:
+        key = search_cache.make_key("serper", query)
+        results = search_cache.get(key)
+        if results is None:
+            results = await limiter.coalesce_async("serper", key, lambda: _serper_search_async(query))
+            search_cache.set(key, results)
+        return str(results.get("organic", [])[:3])
+    except Exception as e:
+        return f"Serper search error: {str(e)}"
+
+web_search = StructuredTool.from_function(
+    func=_web_search,
+    coroutine=_web_search_async,
+    name="web_search",
+    description="Search the web using Serper API - FIXED",
+)
+
+def _tavily_search(query: str) -> str:
+    try:
+        client = tavily_client()
+        key = search_cache.make_key("tavily", query, max_results=3)
+        response = search_cache.get(key)
+        if response is None:
+            response = limiter.call("tavily", key, lambda: client.search(query, max_results=3))
+            search_cache.set(key, response)
+        return str(response)
+    except Exception as e:
+        return f"Tavily search error: {str(e)}"
+
+async def _tavily_search_async(query: str) -> str:
+    try:
+        client = async_tavily_client()
+        key = search_cache.make_key("tavily", query, max_results=3)
+        response = search_cache.get(key)
+        if response is None:
+            response = await limiter.acall("tavily", key, lambda: client.search(query, max_results=3))
+            search_cache.set(key, response)
+        return str(response)
+    except Exception as e:
+        return f"Tavily search error: {str(e)}"
+
+tavily_search = StructuredTool.from_function(
+    func=_tavily_search,
+    coroutine=_tavily_search_async,
+    name="tavily_search",
+    description="Search using Tavily API - FIXED",
+)
+
+class ComparePricesInput(BaseModel):
+    product_name: str = Field(description="Product to compare prices for")
+    retailers: Optional[List[str]] = Field(default=None, description="Retailers to search (Amazon, BestBuy, Walmart, eBay, Target, Costco, Newegg, Daraz); all when omitted")
+    max_results: int = Field(default=10, description="Maximum number of offers to return")
+
+def _compare_prices(product_name: str, retailers: Optional[List[str]] = None, max_results: int = 10) -> str:
+    try:
+        return fetch_price_comparison(product_name, retailers, max_results)
+    except Exception as e:
+        return f"Price comparison error: {str(e)}"
+
+async def _compare_prices_async(product_name: str, retailers: Optional[List[str]] = None, max_results: int = 10) -> str:
+    try:
+        return await fetch_price_comparison_async(product_name, retailers, max_results)
+    except Exception as e:
+        return f"Price comparison error: {str(e)}"
+
+compare_prices = StructuredTool.from_function(
+    func=_compare_prices,
+    coroutine=_compare_prices_async,
+    name="compare_prices",
+    description="Search several retailers at once and list the cheapest matching offers across them",
+    args_schema=ComparePricesInput,
+)
+
+@tool("openai_completion")
+def openai_completion(prompt: str) -> str:
+    """Generate text using OpenAI API"""
+    try:
+        import openai
+        openai.api_key = os.getenv("OPENAI_API_KEY")
+        with limiter.limit("openai"):
+            response = openai.ChatCompletion.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}]
+            )
+        return response.choices[0].message.content
+    except Exception as e:
+        return f"OpenAI error: {str(e)}"
+
+tools = instrument_tools(memoize_tools([navigate, fill_form, click_element, resume_session, store_personal_info, get_personal_info, search_product, get_product_details, purchase_product, scrape, web_search, tavily_search, compare_prices, openai_completion]))
\ No newline at end of file
@@ -0,0 +1,295 @@
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import os
+from http_client import get_client, get_async_client, tavily_client, async_tavily_client, SERPER_URL
+from page_text import extract_text, extract_text_async
+from page_cache import stream_cached, stream_cached_async
+from rate_limit import limiter
+from search_cache import search_cache
+from metrics import instrument_tools
+from tool_memo import memoize_tools
+from retailers import compare_prices, compare_prices_async
+from session_manager import session_manager, search_products, search_products_async, get_product_details, get_product_details_async
+
+def search_products_func(product_name, website="Amazon"):
+    return search_products(product_name, website)
+
+async def search_products_func_async(product_name, website="Amazon"):
+    return await search_products_async(product_name, website)
+
+def get_product_details_func(url, fast=True):
+    return get_product_details(url, fast)
+
+async def get_product_details_func_async(url, fast=True):
+    return await get_product_details_async(url, fast)
+
+def navigate_func(url: str, session_id: str, wait_for: str = "") -> str:
+    return session_manager.execute_action(session_id, "navigate", url, wait_for=wait_for)
+
+def fill_form_func(session_id: str, field_id: str, value: str) -> str:
+    return session_manager.execute_action(session_id, "fill_form", field_id, value)
+
+def click_element_func(session_id: str, element_id: str) -> str:
+    return session_manager.execute_action(session_id, "click_element", element_id)
+
+def resume_session_func(session_id: str) -> str:
+    return session_manager.execute_action(session_id, "restore_state")
+
+def store_personal_info_func(session_id: str, info_type: str, value: str) -> str:
+    session_manager.store_personal_info(session_id, info_type, value)
+    return f"Stored {info_type} securely for session {session_id}."
+
+def get_personal_info_func(session_id: str, info_type: str) -> str:
+    value = session_manager.get_personal_info(session_id, info_type)
+    if value:
+        return f"Retrieved {info_type}: {value}"
+    return f"No {info_type} found for session {session_id}."
+
+def purchase_product_func(session_id: str, product_name: str, website: str = "Amazon") -> str:
+
+    profile = session_manager.get_profile(session_id, ["email", "phone", "name", "address", "credit_card", "password"])
+    email = profile["email"]
+    phone = profile["phone"]
+    name = profile["name"]
+    address = profile["address"]
+    credit_card = profile["credit_card"]
+    password = profile["password"]
+
+    if not all([email, phone, name, address, credit_card, password]):
+        missing = [k for k, v in {
+            "email": email, "phone": phone, "name": name,
+            "address": address, "credit_card": credit_card, "password": password
+        }.items() if not v]
+        return f"Cannot purchase. Missing information: {', '.join(missing)}. Please store this information first."
+    return f"Simulated purchase: Would buy {product_name} from {website} for {name} ({email}) using stored address and payment method. This is a simulation."
+
+def scrape_func(url: str) -> str:
+    try:
+        return extract_text(stream_cached(url), 1500)
+    except Exception as e:
+        return f"Error scraping {url}: {str(e)}"
+
+async def scrape_func_async(url: str) -> str:
+    try:
+        return await extract_text_async(stream_cached_async(url), 1500)
+    except Exception as e:
+        return f"Error scraping {url}: {str(e)}"
+
+def _serper_search(query):
+    headers = {'X-API-KEY': os.getenv("SERPER_API_KEY"), 'Content-Type': 'application/json'}
+    response = get_client().post(SERPER_URL, headers=headers, json={"q": query})
+    response.raise_for_status()
+    return response.json()
+
+async def _serper_search_async(query):
+    headers = {'X-API-KEY': os.getenv("SERPER_API_KEY"), 'Content-Type': 'application/json'}
+    response = await get_async_client().post(SERPER_URL, headers=headers, json={"q": query})
+    response.raise_for_status()
+    return response.json()
+
+def web_search_func(query: str) -> str:
+    try:
+        key = search_cache.make_key("serper", query)
+        results = search_cache.get(key)
+        if results is None:
+            results = limiter.coalesce("serper", key, lambda: _serper_search(query))
+            search_cache.set(key, results)
+        return str(results.get("organic", [])[:2])
+    except Exception as e:
+        return f"Serper search error: {str(e)}"
+
+async def web_search_func_async(query: str) -> str:
+    try:
+        key = search_cache.make_key("serper", query)
+        results = search_cache.get(key)
+        if results is None:
+            results = await limiter.coalesce_async("serper", key, lambda: _serper_search_async(query))
+            search_cache.set(key, results)
+        return str(results.get("organic", [])[:2])
+    except Exception as e:
+        return f"Serper search error: {str(e)}"
+
+def tavily_search_func(query: str) -> str:
+    try:
+        client = tavily_client()
+        key = search_cache.make_key("tavily", query, max_results=2)
+        response = search_cache.get(key)
+        if response is None:
+            response = limiter.call("tavily", key, lambda: client.search(query, max_results=2))
+            search_cache.set(key, response)
+        return str(response)
+    except Exception as e:
+        return f"Tavily search error: {str(e)}"
+
+async def tavily_search_func_async(query: str) -> str:
+    try:
+        client = async_tavily_client()
+        key = search_cache.make_key("tavily", query, max_results=2)
+        response = search_cache.get(key)
+        if response is None:
+            response = await limiter.acall("tavily", key, lambda: client.search(query, max_results=2))
+            search_cache.set(key, response)
+        return str(response)
+    except Exception as e:
+        return f"Tavily search error: {str(e)}"
+
+def compare_prices_func(product_name: str, retailers: Optional[List[str]] = None, max_results: int = 10) -> str:
+    try:
+        return compare_prices(product_name, retailers, max_results)
+    except Exception as e:
+        return f"Price comparison error: {str(e)}"
+
+async def compare_prices_func_async(product_name: str, retailers: Optional[List[str]] = None, max_results: int = 10) -> str:
+    try:
+        return await compare_prices_async(product_name, retailers, max_results)
+    except Exception as e:
+        return f"Price comparison error: {str(e)}"
+
+class NavigateInput(BaseModel):
+    url: str = Field(description="URL to navigate to")
+    session_id: str = Field(description="Session ID for persistent browser state")
+    wait_for: str = Field(default="", description="Optional CSS selector to wait for instead of the full page load")
+
+class FillFormInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+    field_id: str = Field(description="ID of the input field")
+    value: str = Field(description="Value to fill in")
+
+class ClickElementInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+    element_id: str = Field(description="ID of the element to click")
+
+class ResumeSessionInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+
+class StorePersonalInfoInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+    info_type: str = Field(description="Type of personal info (email, phone, name, etc.)")
+    value: str = Field(description="Personal information value")
+
+class GetPersonalInfoInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+    info_type: str = Field(description="Type of personal info to retrieve")
+
+class SearchProductInput(BaseModel):
+    product_name: str = Field(description="Name of the product to search for")
+    website: Optional[str] = Field(description="Website to search on (Amazon, BestBuy, etc.)", default="Amazon")
+
+class GetProductDetailsInput(BaseModel):
+    url: str = Field(description="URL of the product page")
+    fast: bool = Field(description="Stop reading once the page head or product JSON-LD has been parsed", default=True)
+
+class PurchaseProductInput(BaseModel):
+    session_id: str = Field(description="Session ID for persistent browser state")
+    product_name: str = Field(description="Name of the product to purchase")
+    website: Optional[str] = Field(description="Website to purchase from (Amazon, BestBuy, etc.)", default="Amazon")
+
+class ScrapeInput(BaseModel):
+    url: str = Field(description="URL to scrape content from")
+
+class ComparePricesInput(BaseModel):
+    product_name: str = Field(description="Product to compare prices for")
+    retailers: Optional[List[str]] = Field(default=None, description="Retailers to search (Amazon, BestBuy, Walmart, eBay, Target, Costco, Newegg, Daraz); all when omitted")
+    max_results: int = Field(default=10, description="Maximum number of offers to return")
+
+navigate = StructuredTool.from_function(
+    func=navigate_func,
+    name="navigate",
+    description="Navigate to a URL in browser with persistent session",
+    args_schema=NavigateInput,
+)
+
+fill_form = StructuredTool.from_function(
+    func=fill_form_func,
+    name="fill_form",
+    description="Fill a form field on a webpage",
+    args_schema=FillFormInput,
+)
+
+click_element = StructuredTool.from_function(
+    func=click_element_func,
+    name="click_element",
+    description="Click an element on a webpage",
+    args_schema=ClickElementInput,
+)
+
+resume_session = StructuredTool.from_function(
+    func=resume_session_func,
+    name="resume_session",
+    description="Reopen the session's browser where it left off, with its saved logins, cookies and page",
+    args_schema=ResumeSessionInput,
+)
+
+store_personal_info = StructuredTool.from_function(
+    func=store_personal_info_func,
+    name="store_personal_info",
+    description="Securely store personal information",
+    args_schema=StorePersonalInfoInput,
+)
+
+get_personal_info = StructuredTool.from_function(
+    func=get_personal_info_func,
+    name="get_personal_info",
+    description="Retrieve personal information",
+    args_schema=GetPersonalInfoInput,
+)
+
+search_product = StructuredTool.from_function(
+    func=search_products_func,
+    coroutine=search_products_func_async,
+    name="search_product",
+    description="Search for products using Tavily API (works with any e-commerce site)",
+    args_schema=SearchProductInput,
+)
+
+get_product_details = StructuredTool.from_function(
+    func=get_product_details_func,
+    coroutine=get_product_details_func_async,
+    name="get_product_details",
+    description="Get product details from any e-commerce URL",
+    args_schema=GetProductDetailsInput,
+)
+
+purchase_product = StructuredTool.from_function(
+    func=purchase_product_func,
+    name="purchase_product",
+    description="Automate the purchase of a product on any e-commerce site (simulated)",
+    args_schema=PurchaseProductInput,
+)
+
+scrape = StructuredTool.from_function(
+    func=scrape_func,
+    coroutine=scrape_func_async,
+    name="scrape",
+    description="Scrape content from a webpage",
+    args_schema=ScrapeInput,
+)
+
+web_search = StructuredTool.from_function(
+    func=web_search_func,
+    coroutine=web_search_func_async,
+    name="web_search",
+    description="Search the web using Serper API",
+)
+
+tavily_search = StructuredTool.from_function(
+    func=tavily_search_func,
+    coroutine=tavily_search_func_async,
+    name="tavily_search",
+    description="Search using Tavily API",
+)
+
+compare_prices_tool = StructuredTool.from_function(
+    func=compare_prices_func,
+    coroutine=compare_prices_func_async,
+    name="compare_prices",
+    description="Search several retailers at once and list the cheapest matching offers across them",
+    args_schema=ComparePricesInput,
+)
+
+tools = instrument_tools(memoize_tools([
+    navigate, fill_form, click_element, resume_session, store_personal_info, get_personal_info,
+    search_product, get_product_details, purchase_product, scrape,
+    web_search, tavily_search, compare_prices_tool
+]))